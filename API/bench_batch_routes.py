@@ -0,0 +1,71 @@
+"""Batch vs single-pair route benchmark.
+
+Answers the same N random origin-destination pairs twice: once through
+GET /api/route/{start}/{end} per pair, and once through a single
+POST /api/routes/batch request, and reports pairs per second for each.
+Station names and the route table come from the database, so the API must
+be running against a seeded MySQL/MariaDB; no results are recorded yet.
+
+    python3 main.py &
+    python3 bench_batch_routes.py --pairs 10000
+"""
+import argparse
+import json
+import random
+import time
+from urllib.parse import quote
+
+import httpx
+
+
+def station_names(client):
+    stations = client.get("/api/stations").json().get("stations", [])
+    # Names like "JFK/UMass" cannot be passed as a path segment to the single-pair endpoint
+    return [station["name"] for station in stations if "/" not in station["name"]]
+
+
+def bench_single(client, pairs):
+    started = time.perf_counter()
+    for start, end in pairs:
+        client.get(f"/api/route/{quote(start, safe='')}/{quote(end, safe='')}").raise_for_status()
+    return time.perf_counter() - started
+
+
+def bench_batch(client, pairs, include_legs):
+    body = {"pairs": [{"start": s, "end": e} for s, e in pairs], "include_legs": include_legs}
+    started = time.perf_counter()
+    rows = 0
+    with client.stream("POST", "/api/routes/batch", json=body) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if line:
+                json.loads(line)
+                rows += 1
+    elapsed = time.perf_counter() - started
+    assert rows == len(pairs), f"expected {len(pairs)} rows, got {rows}"
+    return elapsed
+
+
+def run(client, n_pairs, seed):
+    names = station_names(client)
+    rng = random.Random(seed)
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(n_pairs)]
+
+    single = bench_single(client, pairs)
+    batch = bench_batch(client, pairs, include_legs=False)
+    batch_legs = bench_batch(client, pairs, include_legs=True)
+
+    print(f"{n_pairs} pairs over {len(names)} stations")
+    print(f"  single-pair GET    {single:8.2f}s  {n_pairs / single:10.0f} pairs/s")
+    print(f"  batch (minutes)    {batch:8.2f}s  {n_pairs / batch:10.0f} pairs/s  ({single / batch:.0f}x)")
+    print(f"  batch (with legs)  {batch_legs:8.2f}s  {n_pairs / batch_legs:10.0f} pairs/s  ({single / batch_legs:.0f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--pairs", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    with httpx.Client(base_url=args.base_url, timeout=120.0) as client:
+        run(client, args.pairs, args.seed)
@@ -0,0 +1,96 @@
+"""Concurrency benchmark for the MBTA API.
+
+Fires a fixed number of requests at an endpoint from N concurrent clients
+and reports latency percentiles per concurrency level. With DB work running
+on the bounded executor, p99 should stay roughly flat as clients grow; that
+is the expectation, not a measured result (see API/README.md).
+
+Local MySQL/MariaDB stand-in:
+
+    docker run -d --name mbta-db -p 3306:3306 \\
+        -e MARIADB_ROOT_PASSWORD=palak003 \\
+        -v "$PWD/../DB:/docker-entrypoint-initdb.d:ro" mariadb:11
+    python3 main.py &
+    python3 bench_concurrency.py --endpoint /api/lines --levels 1 10 50 100 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return float("nan")
+    k = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+async def run_level(client, url, concurrency, total_requests):
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for _ in range(total_requests):
+        queue.put_nowait(None)
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                response = await client.get(url)
+                if response.status_code != 200 or "error" in response.json():
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "mean": statistics.fmean(latencies) if latencies else float("nan"),
+    }
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=max(args.levels), max_keepalive_connections=max(args.levels))
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        # Warm up connections and any lazily built state
+        await run_level(client, args.endpoint, min(args.levels), min(args.levels))
+
+        print(f"{'clients':>8} {'reqs':>6} {'errs':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for level in args.levels:
+            total = max(args.requests, level * args.per_client)
+            r = await run_level(client, args.endpoint, level, total)
+            print(f"{r['concurrency']:>8} {r['requests']:>6} {r['errors']:>5} {r['rps']:>9.1f} "
+                  f"{r['p50']:>8.2f} {r['p95']:>8.2f} {r['p99']:>8.2f}")
+
+        pool_stats = (await client.get("/api/pool/stats")).json()
+        print(f"\npool: {pool_stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--endpoint", default="/api/lines")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 10, 50, 100, 200])
+    parser.add_argument("--requests", type=int, default=1000, help="minimum requests per level")
+    parser.add_argument("--per-client", type=int, default=10, help="requests per client at each level")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,56 @@
+import threading
+import time
+
+
+class VersionedTTLCache:
+    """In-process cache for query results that change only when their tables do.
+
+    An entry is served straight from memory for `ttl` seconds. After that the
+    tables' data version is re-read: if it is unchanged the entry is kept for
+    another `ttl`, otherwise the loader runs again.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}  # key -> (value, version, checked_at)
+        self._lock = threading.Lock()
+
+    def peek(self, key):
+        """Value for key if it is within its TTL, without touching the database"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[2] < self.ttl:
+            return entry[0]
+        return None
+
+    def fetch(self, connection, key, version_fn, loader, wrap=None):
+        """Value for key, revalidated against version_fn(connection) once the TTL is up.
+
+        If given, wrap(value, version) post-processes a freshly loaded value
+        (e.g. to pre-serialize it) before it is stored.
+        """
+        value = self.peek(key)
+        if value is not None:
+            return value
+
+        version = version_fn(connection)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] == version:
+                self._entries[key] = (entry[0], version, time.monotonic())
+                return entry[0]
+
+        value = loader(connection)
+        if wrap is not None:
+            value = wrap(value, version)
+        with self._lock:
+            self._entries[key] = (value, version, time.monotonic())
+        return value
+
+    def invalidate(self, key=None):
+        """Drop one entry, or everything when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
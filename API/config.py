@@ -1,6 +1,12 @@
 import os
+import sys
 from typing import Optional
 
+# The shared network core (network/) lives at the repository root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
 class DatabaseConfig:
     """Database configuration settings"""
     
@@ -10,6 +16,16 @@ class DatabaseConfig:
     DB_NAME = os.getenv("DB_NAME", "SmartTransitApp")
     DB_USER = os.getenv("DB_USER", "root")
     DB_PASSWORD = os.getenv("DB_PASSWORD", "palak003")
+
+    # Connection pool settings
+    POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+    POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    POOL_MAX_IDLE_SECONDS = float(os.getenv("DB_POOL_MAX_IDLE_SECONDS", "300"))
+    POOL_CHECKOUT_TIMEOUT = float(os.getenv("DB_POOL_CHECKOUT_TIMEOUT", "5"))
+    POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", "30"))
+
+    # Seconds a cached aggregate is served before its tables' data version is re-checked
+    QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "60"))
     
     @classmethod
     def get_database_url(cls) -> str:
@@ -25,5 +41,17 @@ class DatabaseConfig:
         cls.DB_USER = username
         cls.DB_PASSWORD = password
 
+class DataConfig:
+    """Locations of the CSV datasets shared with the Streamlit pages"""
+
+    DATA_DIR = os.getenv("MBTA_DATA_DIR", REPO_ROOT)
+    CONNECTIONS_CSV = os.path.join(DATA_DIR, "connections.csv")
+    # Precomputed all-pairs route table (built by route_table.py)
+    ROUTE_TABLE_PATH = os.getenv("ROUTE_TABLE_PATH", os.path.join(DATA_DIR, "DATA", "route_table.npz"))
+    # Per-origin shortest-path searches kept for /api/isochrone
+    ISOCHRONE_CACHE_SIZE = int(os.getenv("ISOCHRONE_CACHE_SIZE", "256"))
+    # Threads for graph searches, GTFS builds and fare pricing, kept apart from the DB executor
+    CPU_WORKERS = int(os.getenv("CPU_WORKERS", "4"))
+
 # Default configuration for existing SmartTransitApp database
 DatabaseConfig.update_connection("localhost", "3306", "SmartTransitApp", "root", "palak003") 
\ No newline at end of file
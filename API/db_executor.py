@@ -0,0 +1,42 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+class DBExecutor:
+    """Runs blocking database work on a bounded thread pool so async handlers can await it"""
+
+    def __init__(self, pool, max_workers=None):
+        self.pool = pool
+        # One worker per pooled connection: extra threads would only queue on checkout
+        self.max_workers = max_workers or pool.max_size
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="db")
+
+    async def run(self, fn, *args):
+        """Await fn(connection, *args) with a connection borrowed from the pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(self._with_connection, fn, *args))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    def _with_connection(self, fn, *args):
+        with self.pool.connection() as connection:
+            return fn(connection, *args)
+
+
+class CPUExecutor:
+    """Runs CPU-bound or file work (graph searches, GTFS builds, fare pricing) on its own bounded pool,
+    so it never holds one of DBExecutor's connection-sized slots"""
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cpu")
+
+    async def run(self, fn, *args):
+        """Await fn(*args) on the compute pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
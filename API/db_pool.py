@@ -0,0 +1,192 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pymysql
+from config import DatabaseConfig
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out before the timeout"""
+
+
+def create_db_connection():
+    """Open a new PyMySQL connection (raises on failure)"""
+    return pymysql.connect(
+        host=DatabaseConfig.DB_HOST,
+        port=int(DatabaseConfig.DB_PORT),
+        user=DatabaseConfig.DB_USER,
+        password=DatabaseConfig.DB_PASSWORD,
+        database=DatabaseConfig.DB_NAME,
+        charset='utf8mb4',
+        cursorclass=pymysql.cursors.DictCursor,
+        # Pooled connections outlive a single request, so never keep an open
+        # transaction (and its stale REPEATABLE READ snapshot) between checkouts
+        autocommit=True
+    )
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of reusable database connections"""
+
+    def __init__(self, connect=create_db_connection, max_size=None, min_size=None,
+                 max_idle=None, checkout_timeout=None, health_check_interval=None):
+        self._connect = connect
+        self.max_size = max_size if max_size is not None else DatabaseConfig.POOL_MAX_SIZE
+        self.min_size = min_size if min_size is not None else DatabaseConfig.POOL_MIN_SIZE
+        self.max_idle = max_idle if max_idle is not None else DatabaseConfig.POOL_MAX_IDLE_SECONDS
+        self.checkout_timeout = (checkout_timeout if checkout_timeout is not None
+                                 else DatabaseConfig.POOL_CHECKOUT_TIMEOUT)
+        self.health_check_interval = (health_check_interval if health_check_interval is not None
+                                      else DatabaseConfig.POOL_HEALTH_CHECK_INTERVAL)
+
+        self._idle = deque()  # (connection, last_used) pairs, most recently used on the right
+        self._size = 0        # idle + checked out
+        self._closed = False
+        self._cond = threading.Condition()
+        self._counters = {
+            "created": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "evicted_idle": 0,
+            "failed_health_checks": 0,
+        }
+
+    def open(self):
+        """Pre-open min_size connections"""
+        for _ in range(self.min_size):
+            conn = self._new_connection()
+            with self._cond:
+                self._size += 1
+                self._idle.append((conn, time.monotonic()))
+
+    def acquire(self, timeout=None):
+        """Check out a healthy connection, waiting up to `timeout` seconds"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                self._evict_idle()
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn, last_used = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"Timed out after {timeout:.1f}s waiting for a database connection "
+                        f"(pool size {self.max_size})")
+                self._counters["waits"] += 1
+                self._cond.wait(remaining)
+            self._counters["checkouts"] += 1
+
+        # Connect / health-check outside the lock so other threads are not blocked on I/O
+        try:
+            if conn is None:
+                return self._new_connection()
+            if time.monotonic() - last_used >= self.health_check_interval and not self._is_healthy(conn):
+                with self._cond:
+                    self._counters["failed_health_checks"] += 1
+                self._close_quietly(conn)
+                return self._new_connection()
+            return conn
+        except Exception:
+            self._discard()
+            raise
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool (or drop it if it is broken)"""
+        if discard or not conn.open:
+            self._close_quietly(conn)
+            self._discard()
+            return
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                self._close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Borrow a connection for the duration of a `with` block"""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except pymysql.err.OperationalError:
+            self.release(conn, discard=True)
+            raise
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def close(self):
+        """Close all idle connections; checked-out ones are closed on release"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                self._close_quietly(conn)
+            self._cond.notify_all()
+
+    def stats(self):
+        """Snapshot of pool usage for sizing and monitoring"""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "max_size": self.max_size,
+                "min_size": self.min_size,
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "max_idle_seconds": self.max_idle,
+                "checkout_timeout_seconds": self.checkout_timeout,
+                **self._counters,
+            }
+
+    def _new_connection(self):
+        conn = self._connect()
+        with self._cond:
+            self._counters["created"] += 1
+        return conn
+
+    def _discard(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _evict_idle(self):
+        # Oldest idle connections sit on the left; keep at least min_size around
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.max_idle:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            self._counters["evicted_idle"] += 1
+            self._close_quietly(conn)
+
+    @staticmethod
+    def _is_healthy(conn):
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
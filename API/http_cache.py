@@ -0,0 +1,67 @@
+"""Pre-serialized responses with ETag / conditional GET support.
+
+Reference data (stations, lines) changes rarely, so each response body is
+encoded to JSON and gzip once per data version and kept in memory. Hot
+requests only compare ETags and hand back the stored bytes.
+"""
+import gzip
+import hashlib
+import json
+
+from fastapi import Request, Response
+
+
+class CachedResponse:
+    def __init__(self, payload, etag, max_age):
+        self.body = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+        self.gzip_body = gzip.compress(self.body, compresslevel=6)
+        self.etag = etag
+        self.max_age = max_age
+
+    def respond(self, request: Request) -> Response:
+        gzipped = accepts_gzip(request.headers.get("accept-encoding"))
+        # Each encoding is a different representation, so it gets its own ETag
+        etag = self.etag[:-1] + '-gzip"' if gzipped else self.etag
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={int(self.max_age)}",
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        if gzipped:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzip_body, media_type="application/json", headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+def make_etag(key, version):
+    """Strong ETag derived from the cache key and its tables' data version"""
+    digest = hashlib.sha1(repr((key, version)).encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows gzip (explicitly or via *) with a non-zero q-value"""
+    qualities = {}
+    for item in (accept_encoding or "").split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    return qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0))) > 0
@@ -1,11 +1,178 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import List, Optional
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-import pymysql
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 import json
-from config import DatabaseConfig
+import numpy as np
+import pandas as pd
+from config import DatabaseConfig, DataConfig
+from db_pool import ConnectionPool
+from cache import VersionedTTLCache
+from http_cache import CachedResponse, make_etag
+from db_executor import CPUExecutor, DBExecutor
 from pathAssistant import MBTAAssistant
+from routing import normalize_station_name
+from network.core import load_network
+from network.whatif import WhatIfEngine
+from network.isochrone import IsochroneIndex
+from gtfs.feed import load_feed
+from gtfs.transfers import load_transfer_table
+from gtfs.calendar import load_calendar
+from gtfs.facilities import SOURCE_TABLES as FACILITY_TABLES, SUMMARY_COLUMNS, station_amenities
+from gtfs.fares import load_fare_engine
+import queries
 
-app = FastAPI(title="MBTA System API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own the database connection pool and the DB and CPU executors for the lifetime of the app"""
+    pool = ConnectionPool()
+    try:
+        pool.open()
+    except Exception as e:
+        # Keep serving; handlers report the error and the pool retries on checkout
+        print(f"Database connection error: {e}")
+    app.state.db_pool = pool
+    app.state.db_executor = DBExecutor(pool)
+    app.state.cpu_executor = CPUExecutor(DataConfig.CPU_WORKERS)
+    app.state.query_cache = VersionedTTLCache(ttl=DatabaseConfig.QUERY_CACHE_TTL_SECONDS)
+    app.state.assistant = None
+    app.state.whatif_engine = None
+    app.state.isochrones = None
+    app.state.amenities = None
+    try:
+        await refresh_assistant(app)
+    except Exception as e:
+        print(f"Could not load network snapshot: {e}")
+    yield
+    app.state.cpu_executor.shutdown()
+    app.state.db_executor.shutdown()
+    pool.close()
+
+app = FastAPI(title="MBTA System API", lifespan=lifespan)
+
+async def refresh_assistant(app: FastAPI):
+    """Build a fresh network snapshot and swap it in for subsequent requests"""
+    assistant = await app.state.db_executor.run(MBTAAssistant)
+    app.state.assistant = assistant
+    app.state.assistant_loaded_at = datetime.now(timezone.utc).isoformat()
+    return assistant
+
+async def cached_query(app: FastAPI, key, version_fn, loader, wrap=None):
+    """Serve a query result from the versioned TTL cache, hitting the database only on expiry"""
+    value = app.state.query_cache.peek(key)
+    if value is None:
+        value = await app.state.db_executor.run(app.state.query_cache.fetch, key, version_fn, loader, wrap)
+    return value
+
+async def cached_json_response(request: Request, key, version_fn, loader):
+    """Pre-serialized, gzipped JSON with an ETag tied to the data version; answers If-None-Match with 304"""
+    max_age = DatabaseConfig.QUERY_CACHE_TTL_SECONDS
+    cached = await cached_query(request.app, key, version_fn, loader,
+                                wrap=lambda payload, version: CachedResponse(payload, make_etag(key, version), max_age))
+    return cached.respond(request)
+
+async def get_assistant(app: FastAPI):
+    """Shared read-only assistant, built on first use if startup could not load it"""
+    return app.state.assistant or await refresh_assistant(app)
+
+async def get_network(app: FastAPI):
+    """The shared network for the current connections.csv (checked and loaded off the event loop)"""
+    return await app.state.cpu_executor.run(load_network, DataConfig.CONNECTIONS_CSV)
+
+async def get_whatif_engine(app: FastAPI):
+    """Closure-impact engine for the current connections.csv, rebuilt when the file changes"""
+    network = await get_network(app)
+    engine = app.state.whatif_engine
+    if engine is None or engine.network is not network:
+        engine = await app.state.cpu_executor.run(WhatIfEngine, network, None, normalize_station_name)
+        app.state.whatif_engine = engine
+    return engine
+
+async def get_isochrones(app: FastAPI):
+    """Reachability index for the current connections.csv; its cached searches go when the file changes"""
+    network = await get_network(app)
+    isochrones = app.state.isochrones
+    if isochrones is None or isochrones.network is not network:
+        isochrones = await app.state.cpu_executor.run(build_isochrones, network)
+        app.state.isochrones = isochrones
+    return isochrones
+
+def build_isochrones(network):
+    isochrones = IsochroneIndex(network, DataConfig.ISOCHRONE_CACHE_SIZE, normalize_station_name)
+    add_walking_transfer_profiles(isochrones)
+    return isochrones
+
+def add_walking_transfer_profiles(isochrones):
+    """Platform-to-platform walking times from the GTFS feed, as the "walk" and "wheelchair" profiles"""
+    try:
+        feed = load_feed()
+        transfers = load_transfer_table(feed)
+    except (OSError, KeyError) as e:
+        print(f"Walking transfer times unavailable: {e}")
+        return
+    stations = isochrones.stations
+    isochrones.add_transfer_profile("walk", transfers.transfer_minutes_by_station(feed.stops, stations))
+    isochrones.add_transfer_profile("wheelchair",
+                                    transfers.transfer_minutes_by_station(feed.stops, stations, wheelchair=True))
+
+async def get_amenities(app: FastAPI):
+    """Feed-derived amenity features per subway station, rebuilt when the network or facility files change"""
+    network = await get_network(app)
+    key = (network.version, await app.state.cpu_executor.run(facility_version))
+    cached = app.state.amenities
+    if cached is None or cached[0] != key:
+        cached = (key, await app.state.cpu_executor.run(station_amenities, network.stations))
+        app.state.amenities = cached
+    return cached[1]
+
+def facility_version():
+    return load_feed().version(*FACILITY_TABLES)
+
+class RoutePair(BaseModel):
+    start: str
+    end: str
+
+class BatchRouteRequest(BaseModel):
+    """Either explicit pairs, or every origin x destination combination"""
+    pairs: Optional[List[RoutePair]] = None
+    origins: Optional[List[str]] = None
+    destinations: Optional[List[str]] = None
+    include_legs: bool = False
+
+class FareLeg(BaseModel):
+    """One ride: stops by stop_id or station name, the route or its fare network, times as HH:MM[:SS]"""
+    from_stop: str
+    to_stop: str
+    route_id: Optional[str] = None
+    network_id: Optional[str] = None
+    # Required: every rapid-transit and bus leg rule is tied to a timeframe
+    start_time: str
+    end_time: Optional[str] = None
+
+class FareJourney(BaseModel):
+    legs: List[FareLeg] = Field(min_length=1)
+    date: Optional[str] = None
+
+class FareBatchRequest(BaseModel):
+    journeys: List[FareJourney]
+    fare_media: Optional[str] = None
+    include_legs: bool = False
+
+class SegmentChange(BaseModel):
+    start: str
+    end: str
+    minutes: float
+
+class WhatIfRequest(BaseModel):
+    """Stations / segments to close and segments to re-time; segments apply both ways by default"""
+    closed_stations: List[str] = []
+    closed_segments: List[RoutePair] = []
+    reweighted_segments: List[SegmentChange] = []
+    both_directions: bool = True
+    limit: int = 20
 
 # Enable CORS for Streamlit
 app.add_middleware(
@@ -16,65 +183,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def get_db_connection():
-    """Create database connection using PyMySQL"""
-    try:
-        connection = pymysql.connect(
-            host=DatabaseConfig.DB_HOST,
-            port=int(DatabaseConfig.DB_PORT),
-            user=DatabaseConfig.DB_USER,
-            password=DatabaseConfig.DB_PASSWORD,
-            database=DatabaseConfig.DB_NAME,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
-        return connection
-    except Exception as e:
-        print(f"Database connection error: {e}")
-        return None
-
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Home endpoint with database connection test and MBTA map information"""
     try:
-        connection = get_db_connection()
-        if not connection:
-            return {
-                "message": "MBTA System API",
-                "version": "1.0.0",
-                "database_status": "error",
-                "error": "Could not connect to database",
-                "mbta_map": {
-                    "map_url": "https://cdn.mbta.com/sites/default/files/2022-12/2022-12-12-subway-map-v37f.pdf",
-                    "interactive_map": "https://www.mbta.com/schedules/subway",
-                    "last_updated": "2024-01-01"
-                }
-            }
-        
-        with connection.cursor() as cursor:
-            # Get total lines
-            cursor.execute("SELECT COUNT(*) as count FROM mbta_lines")
-            total_lines = cursor.fetchone()['count']
-            
-            # Get total stations
-            cursor.execute("SELECT COUNT(*) as count FROM stops")
-            total_stations = cursor.fetchone()['count']
-            
-            # Get total fares
-            cursor.execute("SELECT COUNT(*) as count FROM fares")
-            total_fares = cursor.fetchone()['count']
-        
-        connection.close()
+        stats = await cached_query(request.app, "stats", queries.stats_data_version, queries.fetch_system_stats)
         
         return {
             "message": "MBTA System API",
             "version": "1.0.0",
             "database_status": "connected",
-            "stats": {
-                "total_lines": total_lines,
-                "total_stations": total_stations,
-                "total_fares": total_fares
-            },
+            "stats": stats,
             "mbta_map": {
                 "map_url": "https://cdn.mbta.com/sites/default/files/2022-12/2022-12-12-subway-map-v37f.pdf",
                 "interactive_map": "https://www.mbta.com/schedules/subway",
@@ -95,105 +214,281 @@ async def root():
         }
 
 @app.get("/api/lines")
-async def get_lines():
+async def get_lines(request: Request):
     """Get all MBTA lines"""
     try:
-        connection = get_db_connection()
-        if not connection:
-            return {"error": "Database connection failed"}
-        
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT id, name, color, code, is_active 
-                FROM mbta_lines 
-                WHERE is_active = 1
-            """)
-            lines = cursor.fetchall()
-            
-            # Get station count for each line
-            for line in lines:
-                cursor.execute("""
-                    SELECT COUNT(*) as count 
-                    FROM line_stops 
-                    WHERE line_id = %s
-                """, (line['id'],))
-                line['station_count'] = cursor.fetchone()['count']
-        
-        connection.close()
-        return {"lines": lines, "total_count": len(lines)}
+        return await cached_json_response(request, "lines", queries.lines_data_version, _lines_payload)
         
     except Exception as e:
         return {"error": str(e)}
 
 @app.get("/api/stations")
-async def get_stations():
+async def get_stations(request: Request):
     """Get all stations"""
     try:
-        connection = get_db_connection()
-        if not connection:
-            return {"error": "Database connection failed"}
-        
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT id, name, stop_code, is_active 
-                FROM stops 
-                WHERE is_active = 1
-            """)
-            stations = cursor.fetchall()
-        
-        connection.close()
-        return {"stations": stations, "total_count": len(stations)}
+        return await cached_json_response(request, "stations", queries.stations_data_version, _stations_payload)
         
     except Exception as e:
         return {"error": str(e)}
 
+@app.get("/api/stations/autocomplete")
+async def autocomplete_stations(request: Request, q: str = "", limit: int = 10):
+    """Type-ahead station suggestions for a name prefix"""
+    assistant = await get_assistant(request.app)
+    matches = assistant.stations.autocomplete(q, limit=limit)
+    return {"query": q, "matches": matches, "count": len(matches)}
+
 @app.get("/api/stations/{line_name}")
-async def get_stations_by_line(line_name: str):
+async def get_stations_by_line(request: Request, line_name: str):
     """Get stations by line name"""
     try:
-        connection = get_db_connection()
-        if not connection:
-            return {"error": "Database connection failed"}
-        
-        with connection.cursor() as cursor:
-            # Get line info
-            cursor.execute("""
-                SELECT id, name, color, code 
-                FROM mbta_lines 
-                WHERE name LIKE %s AND is_active = 1
-            """, (f"%{line_name}%",))
-            line = cursor.fetchone()
-            
-            if not line:
-                return {"error": f"Line '{line_name}' not found"}
-            
-            # Get stations for this line
-            cursor.execute("""
-                SELECT s.id, s.name, s.stop_code, ls.stop_sequence, ls.is_terminal
-                FROM line_stops ls
-                JOIN stops s ON ls.stop_id = s.id
-                WHERE ls.line_id = %s AND s.is_active = 1
-                ORDER BY ls.stop_sequence
-            """, (line['id'],))
-            stations = cursor.fetchall()
-        
-        connection.close()
-        
-        return {
-            "line": line,
-            "stations": stations,
-            "count": len(stations)
-        }
+        return await cached_json_response(request, f"line:{line_name.strip().lower()}",
+                                          queries.line_stations_data_version,
+                                          lambda connection: _line_stations_payload(connection, line_name))
         
+    except LookupError:
+        return {"error": f"Line '{line_name}' not found"}
     except Exception as e:
         return {"error": str(e)}
 
+def _lines_payload(connection):
+    lines = queries.fetch_lines(connection)
+    return {"lines": lines, "total_count": len(lines)}
+
+def _stations_payload(connection):
+    stations = queries.fetch_stations(connection)
+    return {"stations": stations, "total_count": len(stations)}
+
+def _line_stations_payload(connection, line_name):
+    line, stations = queries.fetch_line_stations(connection, line_name)
+    if not line:
+        # Raised rather than returned so unknown names are never cached
+        raise LookupError(line_name)
+    return {
+        "line": line,
+        "stations": stations,
+        "count": len(stations)
+    }
+
+@app.get("/api/pool/stats")
+async def get_pool_stats(request: Request):
+    """Get database connection pool statistics"""
+    return request.app.state.db_pool.stats()
+
 @app.get("/api/route/{start_station}/{end_station}")
-async def get_route_between_stations(start_station: str, end_station: str):
+async def get_route_between_stations(request: Request, start_station: str, end_station: str):
     """Get route information between start and end stations"""
-    assistant = MBTAAssistant()
+    assistant = await get_assistant(request.app)
     return assistant.get_route(start_station, end_station)
 
+@app.post("/api/routes/batch")
+async def get_routes_batch(request: Request, body: BatchRouteRequest):
+    """Routes for many origin-destination pairs, streamed back as NDJSON (one JSON object per line)"""
+    if body.pairs is not None:
+        starts = [pair.start for pair in body.pairs]
+        ends = [pair.end for pair in body.pairs]
+    elif body.origins is not None and body.destinations is not None:
+        starts = [o for o in body.origins for _ in body.destinations]
+        ends = list(body.destinations) * len(body.origins)
+    else:
+        return {"error": "Provide either 'pairs' or both 'origins' and 'destinations'"}
+
+    table = (await get_assistant(request.app)).route_table
+    source_ids = table.resolve(starts)
+    target_ids = table.resolve(ends)
+    minutes = table.lookup(source_ids, target_ids)
+    return StreamingResponse(
+        _iter_batch_routes(table, starts, ends, source_ids, target_ids, minutes, body.include_legs),
+        media_type="application/x-ndjson"
+    )
+
+def _iter_batch_routes(table, starts, ends, source_ids, target_ids, minutes, include_legs, chunk_size=1000):
+    for offset in range(0, len(starts), chunk_size):
+        lines = []
+        for i in range(offset, min(offset + chunk_size, len(starts))):
+            row = {"from": starts[i], "to": ends[i]}
+            if source_ids[i] < 0 or target_ids[i] < 0:
+                missing = starts[i] if source_ids[i] < 0 else ends[i]
+                row["error"] = f"Station '{missing}' not found in the MBTA system."
+            elif np.isnan(minutes[i]):
+                row["error"] = "Route not found."
+            elif include_legs:
+                row.update(table.engine.describe_path(table.path_nodes(int(source_ids[i]), int(target_ids[i])),
+                                                      float(minutes[i])))
+                row["from"], row["to"] = starts[i], ends[i]
+                del row["summary"]
+            else:
+                row["total_minutes"] = round(float(minutes[i]), 2)
+            lines.append(json.dumps(row))
+        yield "\n".join(lines) + "\n"
+
+@app.post("/api/whatif")
+async def what_if(request: Request, body: WhatIfRequest):
+    """Travel-time impact of closing stations or segments, or changing segment run times"""
+    engine = await get_whatif_engine(request.app)
+    try:
+        result = await request.app.state.cpu_executor.run(
+            engine.apply,
+            body.closed_stations,
+            [(segment.start, segment.end) for segment in body.closed_segments],
+            [(segment.start, segment.end, segment.minutes) for segment in body.reweighted_segments],
+            body.both_directions
+        )
+    except KeyError as e:
+        return {"error": e.args[0]}
+
+    disconnected = result.disconnected_pairs()
+    return {
+        "summary": result.summary(),
+        "largest_increases": result.changed_pairs(body.limit).round(2).to_dict("records"),
+        "disconnected_pairs": disconnected.head(body.limit).round(2).to_dict("records"),
+        "most_affected_stations": result.station_impact().head(body.limit).round(2).to_dict("records"),
+    }
+
+@app.get("/api/isochrone/stats")
+async def get_isochrone_stats(request: Request):
+    """Size and hit rate of the per-origin search cache"""
+    return (await get_isochrones(request.app)).stats()
+
+@app.get("/api/isochrone/{origin}")
+async def get_isochrone(request: Request, origin: str, minutes: float = 20, transfer_penalty: float = 0,
+                        transfer_profile: Optional[str] = None):
+    """Stations reachable from origin within the given minutes, optionally charging minutes per line change"""
+    if minutes < 0 or transfer_penalty < 0:
+        return {"error": "minutes and transfer_penalty must be non-negative"}
+    isochrones = await get_isochrones(request.app)
+    try:
+        reachable = await request.app.state.cpu_executor.run(
+            isochrones.reachable, origin, minutes, transfer_penalty, transfer_profile
+        )
+    except KeyError as e:
+        return {"error": e.args[0]}
+
+    return {
+        "origin": reachable["Station"].iloc[0],
+        "minutes": minutes,
+        "transfer_penalty": transfer_penalty,
+        "transfer_profile": transfer_profile,
+        "count": len(reachable),
+        "stations": reachable.round(2).replace({np.nan: None}).to_dict("records"),
+    }
+
+@app.get("/api/amenities")
+async def get_station_amenities(request: Request, require: Optional[str] = None):
+    """Amenity flags and facility counts per station; require=Lift,Parking keeps stations having all of them"""
+    amenities = await get_amenities(request.app)
+    if require:
+        wanted = [name.strip() for name in require.split(",") if name.strip()]
+        unknown = [name for name in wanted if name not in SUMMARY_COLUMNS]
+        if unknown:
+            return {"error": f"Unknown amenities {unknown}; choose from {list(SUMMARY_COLUMNS)}"}
+        amenities = amenities[amenities[wanted].all(axis=1)]
+    return {
+        "count": len(amenities),
+        "stations": amenities.astype(object).where(amenities.notna(), None).to_dict("records"),
+    }
+
+@app.get("/api/amenities/{station}")
+async def get_station_amenity(request: Request, station: str):
+    """Amenity flags and facility counts for one station"""
+    amenities = await get_amenities(request.app)
+    match = amenities[amenities["Station"].map(normalize_station_name) == normalize_station_name(station)]
+    if match.empty:
+        return {"error": f"Station '{station}' not found"}
+    return match.astype(object).where(match.notna(), None).iloc[0].to_dict()
+
+@app.get("/api/service/{service_date}")
+async def get_service(request: Request, service_date: str, through: Optional[str] = None, route_type: Optional[int] = None):
+    """Routes with scheduled trips on a date (YYYY-MM-DD or YYYYMMDD), or on any day through a later one"""
+    try:
+        return await request.app.state.cpu_executor.run(service_summary, service_date, through, route_type)
+    except (ValueError, OSError, KeyError) as e:
+        return {"error": str(e)}
+
+def service_summary(service_date, through, route_type):
+    calendar = load_calendar()
+    routes = calendar.active_routes(service_date, through)
+    services = calendar.active_services(service_date, through)
+    routes = routes.merge(load_feed().routes.astype({"route_id": str})[
+        ["route_id", "route_short_name", "route_long_name", "route_type", "route_sort_order"]], on="route_id")
+    if route_type is not None:
+        routes = routes[routes["route_type"] == route_type]
+    first_day, last_day = calendar.window
+    return {
+        "date": service_date,
+        "through": through,
+        "feed_window": [first_day.isoformat(), last_day.isoformat()],
+        "active_services": int(services.sum()),
+        "trips": int(routes["trips"].sum()),
+        "routes": (routes.sort_values("route_sort_order").drop(columns="route_sort_order")
+                   .astype(object).where(routes.notna(), None).to_dict("records")),
+    }
+
+@app.post("/api/fares/batch")
+async def price_fares(request: Request, body: FareBatchRequest):
+    """Fares for many multi-leg journeys on one fare medium (cheapest medium per product if omitted)"""
+    legs = pd.DataFrame([{"journey": number, "date": journey.date, **leg.model_dump()}
+                         for number, journey in enumerate(body.journeys) for leg in journey.legs],
+                        columns=["journey", "date", *FareLeg.model_fields])
+    if legs.empty:
+        return {"error": "Provide at least one journey with at least one leg"}
+    try:
+        engine = await request.app.state.cpu_executor.run(load_fare_engine)
+        priced = await request.app.state.cpu_executor.run(engine.price_legs, legs, body.fare_media)
+        summary = await request.app.state.cpu_executor.run(engine.summarize_journeys, priced)
+    except (ValueError, OSError, KeyError) as e:
+        return {"error": str(e) if not isinstance(e, KeyError) else e.args[0]}
+
+    summary = summary[["journey", "fare", "transfers"]]
+    journeys = summary.astype(object).where(summary.notna(), None).to_dict("records")
+    if body.include_legs:
+        details = priced.drop(columns=["date"]).astype(object).where(priced.notna(), None)
+        legs_by_journey = {number: rows.drop(columns="journey").to_dict("records")
+                           for number, rows in details.groupby("journey", sort=False)}
+        for row in journeys:
+            row["legs"] = legs_by_journey[row["journey"]]
+    return {
+        "fare_media": body.fare_media,
+        "currency": engine.currency,
+        "count": len(journeys),
+        "priced": sum(row["fare"] is not None for row in journeys),
+        "journeys": journeys,
+    }
+
+@app.get("/api/fares/products")
+async def get_fare_products(request: Request, network_id: Optional[str] = None):
+    """Fare products and their price per fare medium, optionally only those a fare network uses"""
+    try:
+        engine = await request.app.state.cpu_executor.run(load_fare_engine)
+    except (OSError, KeyError) as e:
+        return {"error": str(e)}
+    prices = engine.product_prices(network_id).reset_index()
+    return {
+        "network_id": network_id,
+        "currency": engine.currency,
+        "products": prices.astype(object).where(prices.notna(), None).to_dict("records"),
+    }
+
+@app.post("/api/admin/refresh")
+async def refresh_network(request: Request):
+    """Reload the in-memory network snapshot used for routing and drop cached aggregates"""
+    try:
+        request.app.state.query_cache.invalidate()
+        await refresh_assistant(request.app)
+        return {"status": "refreshed", "loaded_at": request.app.state.assistant_loaded_at}
+    except Exception as e:
+        return {"error": str(e)}
+
+@app.post("/api/admin/route-table/reload")
+async def reload_route_table(request: Request):
+    """Reload the precomputed route table from disk without rebuilding the network snapshot"""
+    try:
+        assistant = await get_assistant(request.app)
+        table = await request.app.state.cpu_executor.run(assistant.reload_route_table)
+        return {"status": "reloaded", **table.info()}
+    except Exception as e:
+        return {"error": str(e)}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -1,41 +1,30 @@
-import pymysql
-import json
-from config import DatabaseConfig
+from config import DataConfig
+from db_pool import create_db_connection
+from network.core import load_network
+from routing import RouteEngine, load_segment_minutes
+from route_table import RouteTable
+from station_index import StationIndex
 
 class MBTAAssistant:
+    """Route and station helper over an in-memory snapshot of the subway network.
 
-    def __init__(self):
-        self.connection = pymysql.connect(
-            host=DatabaseConfig.DB_HOST,
-            port=int(DatabaseConfig.DB_PORT),
-            user=DatabaseConfig.DB_USER,
-            password=DatabaseConfig.DB_PASSWORD,
-            database=DatabaseConfig.DB_NAME,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+    The snapshot is loaded once in the constructor and never mutated afterwards,
+    so a single instance can be shared read-only across requests.
+    """
 
-        cursor = self.connection.cursor()
-        
-        cursor.execute("""
-            SELECT name, id
-            FROM mbta_lines 
-            WHERE is_active = 1
-        """)
-        all_lines = cursor.fetchall()
-        lines_id_dict = {line['name']: line['id'] for line in all_lines}
+    def __init__(self, connection=None):
+        owns_connection = connection is None
+        if owns_connection:
+            connection = create_db_connection()
+        try:
+            rows = self._load_line_stops(connection)
+        finally:
+            if owns_connection:
+                connection.close()
 
         line_to_stops = {}
-        for line_name, line_id in lines_id_dict.items():
-            cursor.execute("""
-                SELECT s.name AS stops
-                FROM line_stops AS ls
-                JOIN stops AS s ON ls.stop_id = s.id
-                WHERE ls.line_id = %s AND is_active = 1
-            """, (line_id,))
-            stops = cursor.fetchall()
-            stops = [stop['stops'] for stop in stops]
-            line_to_stops[line_name] = stops
+        for row in rows:
+            line_to_stops.setdefault(row['line_name'], []).append(row['stop_name'])
         
         green_branches = {}
         green_branches['B'] = line_to_stops['Green Line B']
@@ -52,124 +41,54 @@ class MBTAAssistant:
                 'branches': green_branches
             }
         }
-        print(self.lines)
         
-        # Define transfer stations
-        self.transfer_stations = {
-            'Park Street': ['red', 'green'],#
-            'Downtown Crossing': ['red', 'orange'],#
-            'State': ['orange', 'blue'],#
-            'Government Center': ['blue', 'green'],#
-            'Haymarket': ['orange', 'green'],
-            'North Station': ['orange', 'green'],#
-            'Copley': ['green'],
-            'Arlington': ['green'],
-            'Boylston': ['green']
-        }
+        # Normalized name / alias lookups and type-ahead
+        self.stations = StationIndex(rows)
         
+        # Weighted (station, line) graph used for all route queries
+        self.router = RouteEngine(rows, load_segment_minutes(load_network(DataConfig.CONNECTIONS_CSV).edges))
+        # All-pairs answers for the same graph, so route queries are table lookups
+        self.route_table = RouteTable.load_or_build(DataConfig.ROUTE_TABLE_PATH, self.router)
     
+    @staticmethod
+    def _load_line_stops(connection):
+        """Ordered stops of every active line, in a single query"""
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT l.name AS line_name, l.color AS line_color,
+                       s.id AS stop_id, s.name AS stop_name, ls.stop_sequence
+                FROM mbta_lines AS l
+                JOIN line_stops AS ls ON ls.line_id = l.id
+                JOIN stops AS s ON ls.stop_id = s.id
+                WHERE l.is_active = 1 AND s.is_active = 1
+                ORDER BY l.id, ls.stop_sequence
+            """)
+            return cursor.fetchall()
     
     def find_station_line(self, station_name):
         """Find which line(s) a station belongs to"""
-        station_name = station_name.lower().strip()
-        lines_found = []
-        
-        # Check regular lines
-        for line, info in self.lines.items():
-            if line == 'green':
-                # Check Green Line branches
-                for branch, stations in info['branches'].items():
-                    if any(station.lower() == station_name for station in stations):
-                        lines_found.append(f'green-{branch}')
-            else:
-                if any(station.lower() == station_name for station in info['stations']):
-                    lines_found.append(line)
-        
-        return lines_found
+        station = self.stations.lookup(station_name)
+        return list(station['lines']) if station else []
     
     def get_route(self, start_station, end_station):
-        """Get route between two stations"""
+        """Fastest route between two stations, with legs, stop counts and minutes"""
         start = start_station.strip()
         end = end_station.strip()
         
-        # Find lines for both stations
-        start_lines = self.find_station_line(start)
-        end_lines = self.find_station_line(end)
+        if self.router.station_id(start) is None:
+            return {"error": f"Station '{start}' not found in the MBTA system."}
+        if self.router.station_id(end) is None:
+            return {"error": f"Station '{end}' not found in the MBTA system."}
         
-        if not start_lines:
-            return f"Station '{start}' not found in the MBTA system."
-        if not end_lines:
-            return f"Station '{end}' not found in the MBTA system."
-        
-        # Check if they're on the same line
-        for start_line in start_lines:
-            for end_line in end_lines:
-                if start_line.split('-')[0] == end_line.split('-')[0]:  # Same line (handling green branches)
-                    return self._get_direct_route(start, end, start_line.split('-')[0])
-        
-        # If not on same line, find transfer route
-        return self._get_transfer_route(start, end, start_lines, end_lines)
+        route = self.route_table.route(start, end)
+        if route is None:
+            return {"error": "Route not found."}
+        return route
     
-    def _get_direct_route(self, start, end, line):
-        """Get route when both stations are on the same line"""
-        if line == 'green':
-            # For Green Line, check which branch(es) contain both stations
-            for branch, stations in self.lines['green']['branches'].items():
-                start_idx = None
-                end_idx = None
-                for i, station in enumerate(stations):
-                    if station.lower() == start.lower():
-                        start_idx = i
-                    if station.lower() == end.lower():
-                        end_idx = i
-                
-                if start_idx is not None and end_idx is not None:
-                    direction = "outbound" if end_idx > start_idx else "inbound"
-                    stops = abs(end_idx - start_idx)
-                    return f"Take Green Line ({branch} branch) {direction} from {start} to {end}. ({stops} stops)"
-        else:
-            # For other lines
-            stations = self.lines[line]['stations']
-            start_idx = None
-            end_idx = None
-            for i, station in enumerate(stations):
-                if station.lower() == start.lower():
-                    start_idx = i
-                if station.lower() == end.lower():
-                    end_idx = i
-            
-            if start_idx is not None and end_idx is not None:
-                direction = "outbound" if end_idx > start_idx else "inbound"
-                stops = abs(end_idx - start_idx)
-                return f"Take {self.lines[line]['name']} {direction} from {start} to {end}. ({stops} stops)"
-        
-        return "Route not found."
-    
-    def _get_transfer_route(self, start, end, start_lines, end_lines):
-        """Find route requiring transfer"""
-        # Simple implementation: find common transfer stations
-        for transfer_station, lines in self.transfer_stations.items():
-            # Check if we can reach transfer station from start
-            can_reach_from_start = False
-            for start_line in start_lines:
-                if start_line.split('-')[0] in lines:
-                    can_reach_from_start = True
-                    start_to_transfer_line = start_line.split('-')[0]
-                    break
-            
-            # Check if we can reach end from transfer station
-            can_reach_end = False
-            for end_line in end_lines:
-                if end_line.split('-')[0] in lines:
-                    can_reach_end = True
-                    transfer_to_end_line = end_line.split('-')[0]
-                    break
-            
-            if can_reach_from_start and can_reach_end and start_to_transfer_line != transfer_to_end_line:
-                return (f"Take {self.lines[start_to_transfer_line]['name']} from {start} to {transfer_station}, "
-                       f"then transfer to {self.lines[transfer_to_end_line]['name']} to {end}.")
-        
-        return "No direct route found. Multiple transfers (2+) may be required."
+    def reload_route_table(self):
+        """Swap in the route table on disk (rebuilding it if it no longer matches the graph)"""
+        self.route_table = RouteTable.load_or_build(DataConfig.ROUTE_TABLE_PATH, self.router)
+        return self.route_table
     
     def get_line_info(self, line_name):
         """Get information about a specific line"""
@@ -201,7 +120,8 @@ class MBTAAssistant:
                 if len(remaining) > 1:
                     start = remaining[0].strip()
                     end = remaining[1].strip().rstrip('?.')
-                    return self.get_route(start, end)
+                    route = self.get_route(start, end)
+                    return route.get('summary', route.get('error'))
         
         # Line information queries
         elif any(line in question for line in ['red line', 'orange line', 'blue line', 'green line']):
@@ -251,6 +171,6 @@ class MBTAAssistant:
 #     print("\n" + assistant.answer_question("Which line is Park Street on?"))
 #     print("\n" + assistant.answer_question("Tell me about the Red Line"))
 #     print("\n" + assistant.answer_question("How do I get from Assembly to Riverside?"))
-#     print("\n" + assistant.get_route("Harvard", "Stony Brook"))
+#     print("\n" + assistant.get_route("Harvard", "Stony Brook")["summary"])
 #     print("\n" + assistant.answer_question("What line is Copley on?"))
 #     print("\n" + assistant.answer_question("How to get from Davis to Airport?"))
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""Blocking SQL used by the API handlers.
+
+Each function takes an open connection and is run on the DB executor,
+never directly on the event loop.
+"""
+
+
+# Tables each cached result depends on
+STATS_TABLES = ("mbta_lines", "stops", "fares")
+LINES_TABLES = ("mbta_lines", "line_stops")
+STATIONS_TABLES = ("stops",)
+LINE_STATIONS_TABLES = ("mbta_lines", "line_stops", "stops")
+
+
+def fetch_data_version(connection, tables):
+    """Content checksums of the given tables; changes whenever their rows do"""
+    with connection.cursor() as cursor:
+        cursor.execute("CHECKSUM TABLE " + ", ".join(tables))
+        return tuple((row['Table'], row['Checksum']) for row in cursor.fetchall())
+
+
+def stats_data_version(connection):
+    return fetch_data_version(connection, STATS_TABLES)
+
+
+def lines_data_version(connection):
+    return fetch_data_version(connection, LINES_TABLES)
+
+
+def stations_data_version(connection):
+    return fetch_data_version(connection, STATIONS_TABLES)
+
+
+def line_stations_data_version(connection):
+    return fetch_data_version(connection, LINE_STATIONS_TABLES)
+
+
+def fetch_system_stats(connection):
+    """Row counts shown on the home endpoint, in one round trip"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM mbta_lines) AS total_lines,
+                (SELECT COUNT(*) FROM stops) AS total_stations,
+                (SELECT COUNT(*) FROM fares) AS total_fares
+        """)
+        return cursor.fetchone()
+
+
+LINES_SQL = """
+    SELECT l.id, l.name, l.color, l.code, l.is_active,
+           COUNT(ls.stop_id) AS station_count
+    FROM mbta_lines l
+    LEFT JOIN line_stops ls ON ls.line_id = l.id
+    WHERE l.is_active = 1
+    GROUP BY l.id, l.name, l.color, l.code, l.is_active
+    ORDER BY l.id
+"""
+
+
+def fetch_lines(connection):
+    """Active lines with their station counts"""
+    with connection.cursor() as cursor:
+        cursor.execute(LINES_SQL)
+        return cursor.fetchall()
+
+
+def fetch_stations(connection):
+    """All active stations"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT id, name, stop_code, is_active
+            FROM stops
+            WHERE is_active = 1
+        """)
+        return cursor.fetchall()
+
+
+# Line lookups, most selective first. The first two are served by the indexes
+# in DB/AddIndexesSEQ3.sql; the LIKE scan only runs when neither matches.
+LINE_BY_CODE_SQL = """
+    SELECT id, name, color, code
+    FROM mbta_lines
+    WHERE code = %s AND is_active = 1
+    ORDER BY id
+    LIMIT 1
+"""
+
+LINE_BY_NAME_SQL = """
+    SELECT id, name, color, code
+    FROM mbta_lines
+    WHERE name IN (%s, %s) AND is_active = 1
+    ORDER BY id
+    LIMIT 1
+"""
+
+LINE_BY_FUZZY_NAME_SQL = """
+    SELECT id, name, color, code
+    FROM mbta_lines
+    WHERE name LIKE %s AND is_active = 1
+    ORDER BY id
+    LIMIT 1
+"""
+
+LINE_STATIONS_SQL = """
+    SELECT s.id, s.name, s.stop_code, ls.stop_sequence, ls.is_terminal
+    FROM line_stops ls
+    JOIN stops s ON ls.stop_id = s.id
+    WHERE ls.line_id = %s AND s.is_active = 1
+    ORDER BY ls.stop_sequence
+"""
+
+
+def line_name_candidates(line_name):
+    """Exact names a user-supplied line name may refer to: 'red' -> ('red', 'red Line')"""
+    words = line_name.split()
+    if "line" in (word.lower() for word in words):
+        return " ".join(words), " ".join(words)
+    # 'Green B' -> 'Green Line B'
+    return " ".join(words), " ".join(words[:1] + ["Line"] + words[1:])
+
+
+def fetch_line(connection, line_name):
+    """Resolve a line by code, then exact name, then substring; None if nothing matches"""
+    name = " ".join(line_name.split())
+    if not name:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(LINE_BY_CODE_SQL, (name.upper(),))
+        line = cursor.fetchone()
+        if not line:
+            cursor.execute(LINE_BY_NAME_SQL, line_name_candidates(name))
+            line = cursor.fetchone()
+        if not line:
+            cursor.execute(LINE_BY_FUZZY_NAME_SQL, (f"%{name}%",))
+            line = cursor.fetchone()
+    return line
+
+
+def fetch_line_stations(connection, line_name):
+    """Line info and its ordered stations, or (None, []) if the line is unknown"""
+    line = fetch_line(connection, line_name)
+    if not line:
+        return None, []
+
+    with connection.cursor() as cursor:
+        cursor.execute(LINE_STATIONS_SQL, (line['id'],))
+        stations = cursor.fetchall()
+
+    return line, stations
@@ -0,0 +1,159 @@
+"""Precomputed all-pairs route table.
+
+The (station, line) graph from RouteEngine is extended with one origin hub and
+one destination hub per station (zero-cost edges into / out of that station's
+line nodes), and solved with a vectorized Floyd-Warshall. We keep only the
+origin-hub rows, giving
+
+    dist[s, t]  float32 minutes between stations s and t
+    pred[s, j]  predecessor of graph node j on the best path from station s
+
+so a route query is one table lookup plus a short predecessor walk.
+
+Build the artifact offline with `python3 route_table.py`; the API loads it at
+startup and can reload it without restarting.
+"""
+import os
+import time
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+class RouteTable:
+    def __init__(self, engine, dist, pred, version, built_at):
+        self.engine = engine
+        self.dist = dist
+        self.pred = pred
+        self.version = version
+        self.built_at = built_at
+        self._node_count = len(engine.adj)
+        self._station_count = len(engine.station_names)
+
+    @classmethod
+    def build(cls, engine):
+        """Solve all pairs for the engine's current graph"""
+        n_nodes = len(engine.adj)
+        n_stations = len(engine.station_names)
+        n = n_nodes + 2 * n_stations
+        origin = n_nodes                  # origin hub of station s is origin + s
+        destination = n_nodes + n_stations
+
+        dist = np.full((n, n), np.inf)
+        np.fill_diagonal(dist, 0.0)
+        for u, edges in enumerate(engine.adj):
+            for v, minutes, _ in edges:
+                dist[u, v] = min(dist[u, v], minutes)
+        node_station = np.asarray(engine.node_station)
+        nodes = np.arange(n_nodes)
+        dist[origin + node_station, nodes] = 0.0
+        dist[nodes, destination + node_station] = 0.0
+
+        pred = np.where(np.isfinite(dist), np.arange(n)[:, None], -1)
+        np.fill_diagonal(pred, -1)
+        for k in range(n):
+            through_k = dist[:, k, None] + dist[None, k, :]
+            better = through_k < dist
+            dist = np.where(better, through_k, dist)
+            pred = np.where(better, pred[k][None, :], pred)
+
+        stations = np.arange(n_stations)
+        table_dist = dist[origin + stations][:, destination + stations].astype(np.float32)
+        pred_dtype = np.int16 if n < np.iinfo(np.int16).max else np.int32
+        table_pred = pred[origin + stations].astype(pred_dtype)
+        return cls(engine, table_dist, table_pred, engine.fingerprint(), time.time())
+
+    @classmethod
+    def load(cls, path, engine):
+        """Load a saved table, or None if it is missing or was built for a different graph"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if int(data['format_version']) != FORMAT_VERSION or str(data['version']) != engine.fingerprint():
+                return None
+            return cls(engine, data['dist'], data['pred'], str(data['version']), float(data['built_at']))
+
+    @classmethod
+    def load_or_build(cls, path, engine):
+        table = cls.load(path, engine)
+        if table is None:
+            table = cls.build(engine)
+            try:
+                table.save(path)
+            except OSError as e:
+                print(f"Could not save route table: {e}")
+        return table
+
+    def save(self, path):
+        # Write then rename so a concurrent reload never sees a partial file
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, dist=self.dist, pred=self.pred, version=self.version,
+                            built_at=self.built_at, format_version=FORMAT_VERSION)
+        os.replace(tmp_path, path)
+
+    def info(self):
+        return {
+            "version": self.version,
+            "built_at": self.built_at,
+            "stations": self._station_count,
+            "bytes": int(self.dist.nbytes + self.pred.nbytes),
+        }
+
+    def resolve(self, names):
+        """Station ids for a list of names (-1 where unknown), resolving each distinct name once"""
+        ids = {}
+        for name in names:
+            if name not in ids:
+                station = self.engine.station_id(name)
+                ids[name] = -1 if station is None else station
+        return np.fromiter((ids[name] for name in names), dtype=np.int32, count=len(names))
+
+    def lookup(self, source_ids, target_ids):
+        """Vectorized minutes for aligned id arrays; NaN where unknown or unreachable"""
+        valid = (source_ids >= 0) & (target_ids >= 0)
+        minutes = np.full(len(source_ids), np.nan, dtype=np.float32)
+        minutes[valid] = self.dist[source_ids[valid], target_ids[valid]]
+        minutes[np.isinf(minutes)] = np.nan
+        return minutes
+
+    def minutes(self, start, end):
+        source = self.engine.station_id(start)
+        target = self.engine.station_id(end)
+        if source is None or target is None:
+            return None
+        return float(self.dist[source, target])
+
+    def route(self, start, end):
+        """Same result shape as RouteEngine.route, answered from the table"""
+        source = self.engine.station_id(start)
+        target = self.engine.station_id(end)
+        if source is None or target is None or not np.isfinite(self.dist[source, target]):
+            return None
+        return self.engine.describe_path(self.path_nodes(source, target), float(self.dist[source, target]))
+
+    def path_nodes(self, source, target):
+        """Line-node path between two station ids, hubs stripped"""
+        origin_hub = self._node_count + source
+        j = self._node_count + self._station_count + target
+        path = []
+        row = self.pred[source]
+        while True:
+            j = int(row[j])
+            if j == origin_hub:
+                break
+            path.append(j)
+        path.reverse()
+        return path
+
+
+if __name__ == "__main__":
+    from config import DataConfig
+    from pathAssistant import MBTAAssistant
+
+    assistant = MBTAAssistant()
+    started = time.perf_counter()
+    table = RouteTable.build(assistant.router)
+    table.save(DataConfig.ROUTE_TABLE_PATH)
+    print(f"Built route table {table.version[:12]} for {table.info()['stations']} stations "
+          f"in {time.perf_counter() - started:.2f}s -> {DataConfig.ROUTE_TABLE_PATH}")
@@ -0,0 +1,212 @@
+"""Weighted shortest-path routing over the subway network.
+
+Each graph node is a (station, line) pair. Riding between consecutive stops
+of a line costs the segment's minutes from connections.csv; changing lines at
+an interchange costs an explicit transfer penalty. A route query is one
+multi-source Dijkstra from every line serving the origin.
+"""
+import hashlib
+import heapq
+from collections import defaultdict
+
+import config  # noqa: F401  (puts the repo root on sys.path)
+from network.names import normalize_station_name
+
+# Minutes charged for changing lines (walk + average wait)
+DEFAULT_TRANSFER_MINUTES = 5.0
+TRANSFER_MINUTES = {
+    'park street': 4.0,
+    'downtown crossing': 4.0,
+    'state': 4.0,
+    'government center': 3.0,
+    'haymarket': 3.0,
+    'north station': 3.0,
+}
+# Cross-platform change between Green Line branches
+BRANCH_TRANSFER_MINUTES = 3.0
+
+def load_segment_minutes(edges):
+    """{(color, frozenset({a, b})): minutes} from the shared network's edge table, keyed by normalized names"""
+    minutes = {}
+    for from_name, to_name, color, value in edges[['From', 'To', 'Color', 'Minutes']].itertuples(index=False, name=None):
+        pair = frozenset((normalize_station_name(from_name), normalize_station_name(to_name)))
+        minutes[(color, pair)] = float(value)
+    return minutes
+
+
+class RouteEngine:
+    """Adjacency structure over (station, line) nodes, built once and queried read-only"""
+
+    def __init__(self, line_stops, segment_minutes, default_transfer=DEFAULT_TRANSFER_MINUTES,
+                 transfer_minutes=TRANSFER_MINUTES, branch_transfer=BRANCH_TRANSFER_MINUTES):
+        """
+        line_stops: iterable of dicts with line_name, line_color, stop_name, stop_sequence
+        segment_minutes: output of load_segment_minutes
+        """
+        self.station_names = []   # station id -> display name
+        self._station_ids = {}    # normalized name -> station id
+        self.node_station = []    # node id -> station id
+        self.node_line = []       # node id -> line name
+        self.node_sequence = []   # node id -> stop_sequence on that line
+        self.adj = []             # node id -> [(neighbor node id, minutes, is_transfer)]
+        self.station_nodes = defaultdict(list)
+        self.line_colors = {}
+
+        by_line = defaultdict(lambda: defaultdict(list))
+        for row in line_stops:
+            station = self._add_station(row['stop_name'])
+            line = row['line_name']
+            self.line_colors[line] = (row.get('line_color') or '').lower()
+            node = self._add_node(station, line, row['stop_sequence'])
+            by_line[line][row['stop_sequence']].append(node)
+
+        known = list(segment_minutes.values())
+        fallback = sorted(known)[len(known) // 2] if known else 2.5
+        for line, groups in by_line.items():
+            self._link_line(line, groups, segment_minutes, fallback)
+
+        for station, nodes in self.station_nodes.items():
+            key = normalize_station_name(self.station_names[station])
+            for a in nodes:
+                for b in nodes:
+                    if a == b:
+                        continue
+                    same_color = self.line_colors[self.node_line[a]] == self.line_colors[self.node_line[b]]
+                    penalty = branch_transfer if same_color else transfer_minutes.get(key, default_transfer)
+                    self.adj[a].append((b, penalty, True))
+
+    def _add_station(self, name):
+        key = normalize_station_name(name)
+        if key not in self._station_ids:
+            self._station_ids[key] = len(self.station_names)
+            self.station_names.append(name)
+        return self._station_ids[key]
+
+    def _add_node(self, station, line, sequence):
+        node = len(self.node_station)
+        self.node_station.append(station)
+        self.node_line.append(line)
+        self.node_sequence.append(sequence)
+        self.adj.append([])
+        self.station_nodes[station].append(node)
+        return node
+
+    def _link_line(self, line, groups, segment_minutes, fallback):
+        # Branches share stop_sequence values (e.g. Red Line after JFK/UMass), so where
+        # a step has several candidate stops keep only the pairs connections.csv knows
+        color = self.line_colors[line]
+        sequences = sorted(groups)
+        for seq, next_seq in zip(sequences, sequences[1:]):
+            candidates = [(a, b, self._segment(color, a, b, segment_minutes))
+                          for a in groups[seq] for b in groups[next_seq]]
+            if len(candidates) > 1 and any(m is not None for _, _, m in candidates):
+                candidates = [c for c in candidates if c[2] is not None]
+            for a, b, minutes in candidates:
+                minutes = fallback if minutes is None else minutes
+                self.adj[a].append((b, minutes, False))
+                self.adj[b].append((a, minutes, False))
+
+    def _segment(self, color, a, b, segment_minutes):
+        pair = frozenset((normalize_station_name(self.station_names[self.node_station[a]]),
+                          normalize_station_name(self.station_names[self.node_station[b]])))
+        return segment_minutes.get((color, pair))
+
+    def station_id(self, name):
+        return self._station_ids.get(normalize_station_name(name))
+
+    def fingerprint(self):
+        """Stable hash of the graph; changes whenever stations, lines or weights do"""
+        digest = hashlib.sha1()
+        digest.update(repr((self.station_names, self.node_station, self.node_line,
+                            self.node_sequence, self.adj)).encode())
+        return digest.hexdigest()
+
+    def route(self, start, end):
+        """Fastest route between two station names, or None if either is unknown/unreachable"""
+        source = self.station_id(start)
+        target = self.station_id(end)
+        if source is None or target is None:
+            return None
+
+        n = len(self.adj)
+        dist = [float('inf')] * n
+        prev = [-1] * n
+        heap = []
+        for node in self.station_nodes[source]:
+            dist[node] = 0.0
+            heap.append((0.0, node))
+        heapq.heapify(heap)
+
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            if self.node_station[u] == target:
+                return self._build_route(u, dist, prev)
+            for v, w, _ in self.adj[u]:
+                nd = d + w
+                if nd < dist[v]:
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(heap, (nd, v))
+        return None
+
+    def _build_route(self, last, dist, prev):
+        path = [last]
+        while prev[path[-1]] != -1:
+            path.append(prev[path[-1]])
+        path.reverse()
+        return self.describe_path(path, dist[last])
+
+    def describe_path(self, path, total_minutes):
+        """Turn a node path into legs with stop counts and minutes"""
+        legs = []
+        leg = None
+        for u, v in zip(path, path[1:]):
+            minutes = next(w for nbr, w, _ in self.adj[u] if nbr == v)
+            if self.node_line[u] != self.node_line[v]:
+                leg = None
+                continue
+            direction = 'outbound' if self.node_sequence[v] > self.node_sequence[u] else 'inbound'
+            # Reversing on the same line means changing trains between branches (e.g. at JFK/UMass)
+            if leg is None or leg['direction'] != direction:
+                leg = {
+                    'line': self.node_line[u],
+                    'direction': direction,
+                    'from': self.station_names[self.node_station[u]],
+                    'to': None,
+                    'stops': 0,
+                    'minutes': 0.0,
+                    'stations': [self.station_names[self.node_station[u]]],
+                }
+                legs.append(leg)
+            leg['to'] = self.station_names[self.node_station[v]]
+            leg['stops'] += 1
+            leg['minutes'] += minutes
+            leg['stations'].append(leg['to'])
+
+        for leg in legs:
+            leg['minutes'] = round(leg['minutes'], 2)
+
+        start = self.station_names[self.node_station[path[0]]]
+        end = self.station_names[self.node_station[path[-1]]]
+        return {
+            'from': start,
+            'to': end,
+            'total_minutes': round(total_minutes, 2),
+            'transfers': max(len(legs) - 1, 0),
+            'total_stops': sum(leg['stops'] for leg in legs),
+            'legs': legs,
+            'summary': self._summarize(start, end, legs, total_minutes),
+        }
+
+    @staticmethod
+    def _summarize(start, end, legs, total_minutes):
+        if not legs:
+            return f"{start} and {end} are the same station."
+        steps = []
+        for i, leg in enumerate(legs):
+            verb = "Take" if i == 0 else "then transfer to"
+            steps.append(f"{verb} {leg['line']} {leg['direction']} from {leg['from']} to {leg['to']} "
+                         f"({leg['stops']} stops)")
+        return ", ".join(steps) + f". About {total_minutes:.0f} minutes."
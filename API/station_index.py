@@ -0,0 +1,94 @@
+"""Station lookup and type-ahead index.
+
+Built once per network snapshot. Exact lookups go through a dict keyed by
+normalized name (including the aliases in network.names.STATION_ALIASES, so
+"Harvard Square" and "harvard" both resolve). Autocomplete walks a prefix trie
+whose nodes already hold their best matches, so a query costs O(len(prefix)).
+"""
+import config  # noqa: F401  (puts the repo root on sys.path)
+from network.names import STATION_ALIASES, clean_station_name, normalize_station_name
+
+MAX_SUGGESTIONS = 10
+
+
+class _TrieNode:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children = {}
+        self.top = []
+
+
+class StationIndex:
+    def __init__(self, line_stops, max_suggestions=MAX_SUGGESTIONS):
+        """
+        line_stops: iterable of dicts with stop_id, stop_name, line_name, line_color
+        """
+        self.max_suggestions = max_suggestions
+        self._by_key = {}   # normalized name or alias -> station entry
+        stations = {}
+        for row in line_stops:
+            key = normalize_station_name(row['stop_name'])
+            entry = stations.get(key)
+            if entry is None:
+                entry = stations[key] = {'id': row['stop_id'], 'name': row['stop_name'], 'lines': [], 'line_names': []}
+            code = self.line_code(row['line_name'], row.get('line_color'))
+            if code not in entry['lines']:
+                entry['lines'].append(code)
+                entry['line_names'].append(row['line_name'])
+        self.stations = list(stations.values())
+
+        keys = {}
+        for key, entry in stations.items():
+            keys.setdefault(key, entry)
+            self._by_key[key] = entry
+        for alias, canonical in STATION_ALIASES.items():
+            if canonical in stations:
+                keys.setdefault(alias, stations[canonical])
+                self._by_key[alias] = stations[canonical]
+
+        self._root = _TrieNode()
+        for key, entry in keys.items():
+            self._insert(key, entry)
+        self._finalize(self._root)
+
+    @staticmethod
+    def line_code(line_name, color=None):
+        """'Red Line' -> 'red', 'Green Line B' -> 'green-B' (the codes find_station_line returns)"""
+        words = line_name.split()
+        base = (color or words[0]).lower()
+        branch = words[-1] if len(words) > 2 else None
+        return f"{base}-{branch}" if branch else base
+
+    def lookup(self, name):
+        """Station entry for an exact (normalized) name or alias, or None"""
+        return self._by_key.get(normalize_station_name(name))
+
+    def autocomplete(self, prefix, limit=MAX_SUGGESTIONS):
+        """Up to `limit` stations whose name or alias starts with prefix, best first"""
+        node = self._root
+        for ch in clean_station_name(prefix):
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return [self._public(entry) for entry in node.top[:limit]]
+
+    def _insert(self, key, entry):
+        node = self._root
+        node.top.append(entry)
+        for ch in key:
+            node = node.children.setdefault(ch, _TrieNode())
+            node.top.append(entry)
+
+    def _finalize(self, node):
+        # Interchanges first, then alphabetical; an alias and its station share a node only once
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            unique = {id(entry): entry for entry in current.top}.values()
+            current.top = sorted(unique, key=lambda e: (-len(e['lines']), e['name']))[:self.max_suggestions]
+            stack.extend(current.children.values())
+
+    @staticmethod
+    def _public(entry):
+        return {'id': entry['id'], 'name': entry['name'], 'lines': entry['line_names']}
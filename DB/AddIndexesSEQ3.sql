@@ -0,0 +1,16 @@
+USE SmartTransitApp;
+
+-- Indexes for the API's hot lookups. Run once after CreateTablesSEQ1.sql.
+
+-- Exact line lookups by code or full name (GET /api/stations/{line_name})
+CREATE INDEX idx_mbta_lines_code ON mbta_lines (code, is_active);
+CREATE INDEX idx_mbta_lines_name ON mbta_lines (name, is_active);
+
+-- Stations of a line in order: filters on line_id, reads stop_sequence and
+-- stop_id from the index and needs no filesort
+CREATE INDEX idx_line_stops_line_sequence ON line_stops (line_id, stop_sequence, stop_id);
+
+-- Active stations list
+CREATE INDEX idx_stops_active ON stops (is_active, id);
+
+ANALYZE TABLE mbta_lines, line_stops, stops;
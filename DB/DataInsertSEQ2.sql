@@ -111,6 +111,7 @@ INSERT INTO stops (name, stop_code, is_active) VALUES
 ('Brookline Hills', 'BRKHL', 1),
 ('Brookline Village', 'BRKVL', 1),
 ('Longwood Medical Area', 'LONGW', 1),
+('Longwood', 'LONGD', 1),
 ('Fenway', 'FENWY', 1),
 ('Heath Street', 'HEATH', 1),
 ('Back of the Hill', 'BACKH', 1),
@@ -266,7 +267,7 @@ INSERT INTO line_stops (line_id, stop_id, stop_sequence, is_terminal) VALUES
 (6, (SELECT id FROM stops WHERE name = 'Hynes Convention Center'), 11, 0),
 (6, (SELECT id FROM stops WHERE name = 'Kenmore'), 12, 0),
 (6, (SELECT id FROM stops WHERE name = 'Fenway'), 13, 0),
-(6, (SELECT id FROM stops WHERE name = 'Longwood Medical Area'), 14, 0),
+(6, (SELECT id FROM stops WHERE name = 'Longwood'), 14, 0),
 (6, (SELECT id FROM stops WHERE name = 'Brookline Village'), 15, 0),
 (6, (SELECT id FROM stops WHERE name = 'Brookline Hills'), 16, 0),
 (6, (SELECT id FROM stops WHERE name = 'Beaconsfield'), 17, 0),
@@ -1,7 +1,16 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 
+from network.analytics import inputs_version
+from network.core import load_network
+from network.isochrone import IsochroneIndex
+from network.names import normalize_station_name
+from gtfs.feed import load_feed
+from gtfs.shapes import route_shape_coordinates, stop_points
+from gtfs.transfers import load_transfer_table
+
 st.set_page_config(page_title="Subway Network", layout="wide", page_icon="🚇")
 
 # Custom CSS for better styling
@@ -107,18 +116,12 @@ st.markdown("""
 
 
 # Load Data
-stations_df = pd.read_csv("stations.csv")
-locations_df = pd.read_csv("locations.csv")
-connections_df = pd.read_csv("connections.csv")
-
-locations_df_unique = locations_df.drop_duplicates(subset='Station Name', keep='first')
-location_map = locations_df_unique.set_index('Station Name')[['x', 'y']].to_dict('index')
+network = load_network()
+connections_df = network.edges
+data_version = inputs_version()
 
 # Coordinate Sacling
 scale = 10
-for station in location_map:
-    location_map[station]['x'] *= scale
-    location_map[station]['y'] *= scale
 
 # Color Mapping
 color_map = {
@@ -128,51 +131,195 @@ color_map = {
     'orange': '#e67e22',
 }
 
-# Build the mbta graph
-fig = go.Figure()
-
-# Draw colored edges per line
-for color in set(connections_df['Color']):
-    color_edges_x, color_edges_y = [], []
-    for _, row in connections_df[connections_df['Color'] == color].iterrows():
-        if row['From'] in location_map and row['To'] in location_map:
-            x0, y0 = location_map[row['From']]['x'], location_map[row['From']]['y']
-            x1, y1 = location_map[row['To']]['x'], location_map[row['To']]['y']
-            color_edges_x += [x0, x1, None]
-            color_edges_y += [y0, y1, None]
-    fig.add_trace(go.Scatter(
-        x=color_edges_x, y=color_edges_y,
-        mode='lines',
-        line=dict(color=color_map.get(color, '#95a5a6'), width=4),
-        name=color.title() + " Line",
-        hoverinfo='none'
+# Above this many stations the SVG renderer gets sluggish
+WEBGL_MIN_STATIONS = 1000
+
+
+@st.cache_data
+def load_station_positions(data_version):
+    """One scaled (x, y) per station name, first row wins"""
+    locations_df = pd.read_csv("locations.csv")
+    positions = locations_df.drop_duplicates(subset='Station Name', keep='first').set_index('Station Name')[['x', 'y']]
+    return positions * scale
+
+
+def edge_coordinates(edges, positions):
+    """Per line colour, x / y arrays of x0, x1, NaN triples (NaN breaks the line between segments)"""
+    segments = (edges[['From', 'To', 'Color']]
+                .join(positions, on='From')
+                .join(positions, on='To', rsuffix='_to')
+                .dropna(subset=['x', 'x_to']))
+    coordinates = {}
+    for color, group in segments.groupby('Color', sort=False):
+        gap = np.full(len(group), np.nan)
+        coordinates[color] = (np.column_stack([group['x'], group['x_to'], gap]).ravel(),
+                              np.column_stack([group['y'], group['y_to'], gap]).ravel())
+    return coordinates
+
+
+@st.cache_data
+def build_network_figure(data_version, renderer, with_stations=True):
+    """The line map for one data version and renderer; st.cache_data hands each rerun its own copy"""
+    positions = load_station_positions(data_version)
+    scatter = go.Scattergl if renderer == "WebGL" else go.Scatter
+    fig = go.Figure()
+
+    # Draw colored edges per line
+    for color, (edges_x, edges_y) in edge_coordinates(connections_df, positions).items():
+        fig.add_trace(scatter(
+            x=edges_x, y=edges_y,
+            mode='lines',
+            line=dict(color=color_map.get(color, '#95a5a6'), width=4),
+            name=color.title() + " Line",
+            hoverinfo='none'
+        ))
+
+    # Draw stations
+    if with_stations:
+        fig.add_trace(scatter(
+            x=positions['x'], y=positions['y'],
+            mode='markers',
+            marker=dict(size=18, color='#2c3e50', line=dict(width=2, color='white')),
+            text=positions.index,
+            hoverinfo='text',
+            name='Stations'
+        ))
+
+    fig.update_layout(
+        title="Subway Network Map",
+        showlegend=True,
+        hovermode='closest',
+        margin=dict(l=20, r=20, t=40, b=20),
+        height=900,
+        template="plotly_white",
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+
+@st.cache_data
+def build_gtfs_figure(feed_version, renderer):
+    """GTFS stations and stops (about 7k points) on lon / lat axes, plus route shapes when the feed has shapes.txt"""
+    feed = load_feed()
+    scatter = go.Scattergl if renderer == "WebGL" else go.Scatter
+    fig = go.Figure()
+
+    if feed.has_table("shapes"):
+        for label, color, shape_x, shape_y in route_shape_coordinates(feed.routes, feed.trips, feed.shapes).values():
+            fig.add_trace(scatter(
+                x=shape_x, y=shape_y,
+                mode='lines',
+                line=dict(color=color, width=2),
+                name=label,
+                hoverinfo='name',
+                showlegend=False
+            ))
+
+    stops = stop_points(feed.stops)
+    fig.add_trace(scatter(
+        x=stops['x'], y=stops['y'],
+        mode='markers',
+        marker=dict(size=4, color='#2c3e50'),
+        text=stops['stop_name'],
+        hoverinfo='text',
+        name='Stops'
     ))
 
-# Draw stations
-node_x = [v['x'] for v in location_map.values()]
-node_y = [v['y'] for v in location_map.values()]
-node_labels = list(location_map.keys())
-
-fig.add_trace(go.Scatter(
-    x=node_x, y=node_y,
-    mode='markers',
-    marker=dict(size=18, color='#2c3e50', line=dict(width=2, color='white')),
-    text=node_labels,
-    hoverinfo='text',
-    name='Stations'
-))
-
-fig.update_layout(
-    title="Subway Network Map",
-    showlegend=True,
-    hovermode='closest',
-    margin=dict(l=20, r=20, t=40, b=20),
-    height=900,
-    template="plotly_white",
-    xaxis=dict(visible=False),
-    yaxis=dict(visible=False),
-    plot_bgcolor='rgba(0,0,0,0)'
-)
+    fig.update_layout(
+        title=f"GTFS Network: {len(stops)} stops",
+        showlegend=False,
+        hovermode='closest',
+        margin=dict(l=20, r=20, t=40, b=20),
+        height=900,
+        template="plotly_white",
+        xaxis=dict(visible=False),
+        # One degree of latitude is ~1.35 degrees of longitude at Boston
+        yaxis=dict(visible=False, scaleanchor='x', scaleratio=1.35),
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+
+@st.cache_resource
+def get_isochrones(data_version, _network):
+    """Per-origin searches, kept across reruns so moving the slider reuses them"""
+    isochrones = IsochroneIndex(_network, name_key=normalize_station_name)
+    feed = load_feed()
+    transfers = load_transfer_table(feed)
+    stations = _network.stations
+    isochrones.add_transfer_profile("walk", transfers.transfer_minutes_by_station(feed.stops, stations))
+    isochrones.add_transfer_profile("wheelchair",
+                                    transfers.transfer_minutes_by_station(feed.stops, stations, wheelchair=True))
+    return isochrones
+
+
+# Map mode and renderer
+col1, col2 = st.columns(2)
+with col1:
+    map_mode = st.radio("Map mode", ["Lines", "Reachability", "GTFS stops"], horizontal=True,
+                        help="GTFS stops draws every station and stop in the feed, and route lines if it has shapes.txt")
+with col2:
+    renderer = st.radio("Renderer", ["Auto", "SVG", "WebGL"], horizontal=True,
+                        help="WebGL draws large stop networks without freezing the browser")
+
+positions = load_station_positions(data_version)
+if renderer == "Auto":
+    # The GTFS layer is always past the threshold
+    large = map_mode == "GTFS stops" or len(positions) >= WEBGL_MIN_STATIONS
+    renderer = "WebGL" if large else "SVG"
+
+if map_mode == "Reachability":
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        origin = st.selectbox("Origin station", sorted(network.stations))
+    with col2:
+        budget = st.slider("Travel time (minutes)", 5, 90, 20, step=5)
+    with col3:
+        transfer_penalty = st.slider("Transfer penalty (minutes)", 0, 15, 0)
+    with col4:
+        transfer_walk = st.selectbox("Interchange walking time", ["None", "Walking", "Step-free"],
+                                     help="Platform-to-platform times from the GTFS pathways and transfers")
+    transfer_profile = {"Walking": "walk", "Step-free": "wheelchair"}.get(transfer_walk)
+
+    fig = build_network_figure(data_version, renderer, with_stations=False)
+    scatter = go.Scattergl if renderer == "WebGL" else go.Scatter
+    reachable = get_isochrones(network.version, network).reachable(origin, budget, transfer_penalty, transfer_profile)
+    minutes = reachable.set_index("Station")["Minutes"]
+    in_reach = positions.index.isin(minutes.index)
+    reached = positions[in_reach]
+    reached_minutes = minutes.reindex(reached.index)
+
+    # Out-of-reach stations stay on the map, small and grey
+    fig.add_trace(scatter(
+        x=positions.loc[~in_reach, 'x'], y=positions.loc[~in_reach, 'y'],
+        mode='markers',
+        marker=dict(size=10, color='#cbd5e1', line=dict(width=1, color='white')),
+        text=positions.index[~in_reach],
+        hoverinfo='text',
+        name='Out of reach'
+    ))
+    fig.add_trace(scatter(
+        x=reached['x'], y=reached['y'],
+        mode='markers',
+        marker=dict(size=18, color=reached_minutes, colorscale='Viridis', cmin=0, cmax=budget,
+                    colorbar=dict(title="Minutes"), line=dict(width=2, color='white')),
+        text=[f"{name}: {value:.1f} min" for name, value in reached_minutes.items()],
+        hoverinfo='text',
+        name=f'Within {budget} min'
+    ))
+    st.caption(f"{len(reachable)} stations reachable from {origin} within {budget} minutes"
+               + (f" with a {transfer_penalty}-minute penalty per line change" if transfer_penalty else "")
+               + (f" plus {transfer_walk.lower()} interchange times" if transfer_profile else ""))
+elif map_mode == "GTFS stops":
+    feed = load_feed()
+    tables = [name for name in ("stops", "routes", "trips", "shapes") if feed.has_table(name)]
+    fig = build_gtfs_figure(feed.version(*tables), renderer)
+    if not feed.has_table("shapes"):
+        st.caption("This GTFS feed has no shapes.txt, so only stops are drawn; add shapes.txt to the feed to see route lines.")
+else:
+    fig = build_network_figure(data_version, renderer)
 
 # Display Map
-st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+st.plotly_chart(fig, use_container_width=True)
@@ -46,17 +46,30 @@ st.markdown("""
 st.markdown('<h1 class="main-header">🚇 Boston MBTA System</h1>', unsafe_allow_html=True)
 
 # Helper functions
+@st.cache_resource
+def get_etag_cache() -> Dict[str, Any]:
+    """GET responses kept across reruns, keyed by URL and revalidated with If-None-Match"""
+    return {}
+
 def make_api_request(endpoint: str, method: str = "GET", data: Dict[str, Any] = None):
     """Make API request to FastAPI backend"""
     try:
         url = f"{API_BASE_URL}{endpoint}"
+        etag_cache = get_etag_cache()
         if method == "GET":
-            response = requests.get(url)
+            cached = etag_cache.get(url)
+            headers = {"If-None-Match": cached[0]} if cached else {}
+            response = requests.get(url, headers=headers)
+            if response.status_code == 304:
+                return cached[1]
         else:
             response = requests.post(url, json=data)
         
         if response.status_code == 200:
-            return response.json()
+            result = response.json()
+            if method == "GET" and response.headers.get("ETag"):
+                etag_cache[url] = (response.headers["ETag"], result)
+            return result
         else:
             st.error(f"API Error: {response.status_code}")
             return None
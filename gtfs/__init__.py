@@ -0,0 +1 @@
+"""Typed, cached access to the MBTA GTFS feed in MBTA_GTFS_OfficialOnlineDataset"""
@@ -0,0 +1,163 @@
+"""Which services, trips, route patterns and routes run on a given date.
+
+Every service_id is compiled once into a bitset over the feed's validity
+window (one bit per day, packed eight to a byte): its calendar.txt weekday
+pattern between start_date and end_date, then calendar_dates.txt additions
+(exception_type 1) and removals (2). "What runs on D" is then one bit test
+per service, and trips inherit their service's bit through an int32 code,
+so no table is filtered row by row.
+
+    calendar = load_calendar()
+    calendar.active_trips("2025-08-01")                  # bool per trips.txt row
+    calendar.active_routes("2025-08-01")                 # route_id, trips that day
+    calendar.active_routes("2025-08-01", "2025-08-07")   # ... on any day in the range
+
+Results for single dates are cached per calendar, so date pickers redraw
+without recomputing.
+"""
+import threading
+from datetime import date as Date
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from gtfs.feed import load_feed
+
+ADDED, REMOVED = 1, 2
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+CACHED_DATES = 512
+
+
+def to_day(value):
+    """A date-like value (date, Timestamp, 'YYYY-MM-DD', 'YYYYMMDD' or int YYYYMMDD) as datetime64[D]"""
+    if isinstance(value, (int, np.integer)):
+        value = str(value)
+    if isinstance(value, str) and len(value) == 8 and value.isdigit():
+        value = f"{value[:4]}-{value[4:6]}-{value[6:]}"
+    if isinstance(value, Date):
+        value = value.isoformat()[:10]
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+def gtfs_days(values):
+    """int32 YYYYMMDD column to datetime64[D]"""
+    return pd.to_datetime(pd.Series(values).astype(str), format="%Y%m%d").to_numpy().astype("datetime64[D]")
+
+
+class ServiceCalendar:
+    def __init__(self, calendar, calendar_dates, trips):
+        self.service_ids = pd.Index(sorted(set(calendar["service_id"].astype(str))
+                                           | set(calendar_dates["service_id"].astype(str))
+                                           | set(trips["service_id"].astype(str))), name="service_id")
+        starts, ends = gtfs_days(calendar["start_date"]), gtfs_days(calendar["end_date"])
+        exception_days = gtfs_days(calendar_dates["date"])
+        every_day = np.concatenate([starts, ends, exception_days])
+        self.start = every_day.min() if len(every_day) else np.datetime64("1970-01-01", "D")
+        self.end = every_day.max() if len(every_day) else self.start - 1
+        self.days = int((self.end - self.start).astype(int)) + 1
+
+        # Unpacked (services x days) while building; kept packed afterwards
+        running = np.zeros((len(self.service_ids), max(self.days, 0)), dtype=bool)
+        day_numbers = np.arange(self.days)
+        weekday_of_day = (self.start + day_numbers).astype("datetime64[D]").view("int64")
+        weekday_of_day = (weekday_of_day + 3) % 7   # 1970-01-01 was a Thursday; Monday = 0
+        weekday_flags = calendar[list(WEEKDAYS)].to_numpy(dtype=bool)
+        rows = self.service_ids.get_indexer(calendar["service_id"].astype(str))
+        first = (starts - self.start).astype(int)
+        last = (ends - self.start).astype(int)
+        in_range = (day_numbers >= first[:, None]) & (day_numbers <= last[:, None])
+        running[rows] = in_range & weekday_flags[:, weekday_of_day]
+
+        exception_rows = self.service_ids.get_indexer(calendar_dates["service_id"].astype(str))
+        exception_cols = (exception_days - self.start).astype(int)
+        exception_type = calendar_dates["exception_type"].to_numpy()
+        running[exception_rows[exception_type == ADDED], exception_cols[exception_type == ADDED]] = True
+        running[exception_rows[exception_type == REMOVED], exception_cols[exception_type == REMOVED]] = False
+        self.bits = np.packbits(running, axis=1)
+
+        # Trips point at their service (and route / pattern) by integer code
+        self.trip_ids = trips["trip_id"]
+        self.trip_services = self.service_ids.get_indexer(trips["service_id"].astype(str)).astype(np.int32)
+        self.route_ids, self.trip_routes = self._codes(trips["route_id"])
+        if "route_pattern_id" in trips:
+            self.route_pattern_ids, self.trip_route_patterns = self._codes(trips["route_pattern_id"])
+        else:
+            self.route_pattern_ids, self.trip_route_patterns = pd.Index([]), np.full(len(trips), -1, np.int32)
+
+        self._services_on = lru_cache(maxsize=CACHED_DATES)(self._compute_services_on)
+
+    @staticmethod
+    def _codes(column):
+        codes, uniques = pd.factorize(column.astype(str))
+        return pd.Index(uniques), codes.astype(np.int32)
+
+    def day_number(self, value):
+        """Offset of a date into the window; None outside it"""
+        offset = int((to_day(value) - self.start).astype(int))
+        return offset if 0 <= offset < self.days else None
+
+    @property
+    def window(self):
+        return pd.Timestamp(self.start).date(), pd.Timestamp(self.end).date()
+
+    def _compute_services_on(self, offset):
+        if offset is None:
+            services = np.zeros(len(self.service_ids), dtype=bool)
+        else:
+            services = (self.bits[:, offset >> 3] >> (7 - (offset & 7))) & 1 == 1
+        services.setflags(write=False)
+        return services
+
+    def active_services(self, start, end=None):
+        """Bool per service_id: runs on start, or on any day from start to end inclusive"""
+        if end is None:
+            return self._services_on(self.day_number(start))
+        first = max(int((to_day(start) - self.start).astype(int)), 0)
+        last = min(int((to_day(end) - self.start).astype(int)), self.days - 1)
+        if first > last:
+            return np.zeros(len(self.service_ids), dtype=bool)
+        return np.unpackbits(self.bits, axis=1, count=self.days)[:, first:last + 1].any(axis=1)
+
+    def active_trips(self, start, end=None):
+        """Bool per trips.txt row"""
+        services = self.active_services(start, end)
+        return (self.trip_services >= 0) & services[np.maximum(self.trip_services, 0)]
+
+    def _count_by(self, codes, ids, start, end, name):
+        trips = self.active_trips(start, end) & (codes >= 0)
+        counts = np.bincount(codes[trips], minlength=len(ids))
+        running = np.flatnonzero(counts)
+        return pd.DataFrame({name: ids[running], "trips": counts[running]})
+
+    def active_routes(self, start, end=None):
+        """route_id and number of active trips, for routes with at least one"""
+        return self._count_by(self.trip_routes, self.route_ids, start, end, "route_id")
+
+    def active_route_patterns(self, start, end=None):
+        return self._count_by(self.trip_route_patterns, self.route_pattern_ids, start, end, "route_pattern_id")
+
+    def trips_per_day(self):
+        """Scheduled trips on every day of the window, from one matrix product"""
+        trips_per_service = np.bincount(self.trip_services[self.trip_services >= 0], minlength=len(self.service_ids))
+        running = np.unpackbits(self.bits, axis=1, count=self.days)
+        dates = self.start + np.arange(self.days)
+        return pd.Series(trips_per_service @ running, index=pd.DatetimeIndex(dates, name="date"), name="trips")
+
+    def cache_info(self):
+        return self._services_on.cache_info()
+
+
+_calendars = {}
+_calendars_lock = threading.Lock()
+
+
+def load_calendar(feed=None):
+    """The resolver for the feed's current calendar / calendar_dates / trips, built once per version"""
+    feed = feed or load_feed()
+    key = (feed.path, feed.version("calendar", "calendar_dates", "trips"))
+    with _calendars_lock:
+        calendar = _calendars.get(key)
+        if calendar is None:
+            calendar = _calendars[key] = ServiceCalendar(feed.calendar, feed.calendar_dates, feed.trips)
+    return calendar
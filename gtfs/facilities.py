@@ -0,0 +1,130 @@
+"""Per-station accessibility and amenity features from the GTFS facilities files.
+
+facilities.txt lists elevators, escalators, ramps, parking areas, bike
+storage and so on, each at a stop; facilities_properties.txt adds long-format
+key/value properties. Both are folded onto parent stations with one
+bincount over (station, facility type) codes, giving:
+
+    <facility_type>      int8 count per type (elevator, escalator, ramp, ...)
+    Parking_Spaces       int32 capacity of the station's parking areas
+    Accessible_Spaces    int32 accessible spaces among them
+    Parking / Ramp / Lift / Underground / Step_Free
+                         bool summaries; Lift is an elevator or portable
+                         boarding lift, Underground a rapid-transit platform
+                         below street level, Step_Free the station's
+                         wheelchair_boarding flag
+
+The matrix is cached as Parquet beside the feed cache, keyed by the source
+files' hashes. station_amenities() maps it onto the project's station names.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from gtfs.feed import load_feed
+from gtfs.stations import match_parent_stations, rapid_transit_parents
+
+SOURCE_TABLES = ("stops", "levels", "facilities", "facilities_properties")
+# Part of the cache file name; bump when the features change
+FEATURES_VERSION = 1
+CAPACITY_PROPERTIES = {"capacity": "Parking_Spaces", "capacity-accessible": "Accessible_Spaces"}
+SUMMARY_COLUMNS = ("Parking", "Ramp", "Lift", "Underground", "Step_Free")
+ACCESSIBLE = 1
+PARKING_AREA = "parking-area"
+
+
+def parent_of(stops, stop_ids):
+    """Parent station id of each stop id (a parent station is its own parent); NaN if unknown"""
+    by_id = stops.assign(stop_id=stops["stop_id"].astype(str)).set_index("stop_id")
+    stop_ids = pd.Series(stop_ids, dtype=object).astype(str)
+    parent = stop_ids.map(by_id["parent_station"].astype(object))
+    is_parent = stop_ids.map(by_id["location_type"]) == 1
+    return parent.where(~is_parent, stop_ids).where(stop_ids.isin(by_id.index)).to_numpy()
+
+
+def build_station_features(feed=None):
+    """Feature matrix indexed by parent stop_id, one row per parent station"""
+    feed = feed or load_feed()
+    stops = feed.stops
+    parents = stops[stops["location_type"] == 1]
+    station_ids = pd.Index(parents["stop_id"].astype(str), name="parent_station")
+
+    facilities = feed.facilities
+    station_codes = station_ids.get_indexer(parent_of(stops, facilities["stop_id"]))
+    type_codes, types = pd.factorize(facilities["facility_type"].astype(str), sort=True)
+    placed = station_codes >= 0
+
+    # The pivot: one bincount over flattened (station, type) cells
+    cells = station_codes[placed].astype(np.int64) * len(types) + type_codes[placed]
+    counts = np.bincount(cells, minlength=len(station_ids) * len(types)).reshape(len(station_ids), len(types))
+    features = pd.DataFrame(np.minimum(counts, np.iinfo(np.int8).max).astype(np.int8),
+                            index=station_ids, columns=list(types))
+
+    properties = feed.facilities_properties
+    properties = properties[properties["property_id"].astype(str).isin(CAPACITY_PROPERTIES)]
+    # Capacities count parking-area facilities only (bike storage has a capacity too)
+    facility_station = pd.Series(np.where(facilities["facility_type"].astype(str) == PARKING_AREA, station_codes, -1),
+                                 index=facilities["facility_id"].astype(str))
+    property_stations = facility_station.reindex(properties["facility_id"].astype(str)).fillna(-1).to_numpy(np.int64)
+    values = pd.to_numeric(properties["value"], errors="coerce").fillna(0).to_numpy()
+    property_ids = properties["property_id"].astype(str).to_numpy()
+    for property_id, column in CAPACITY_PROPERTIES.items():
+        rows = (property_ids == property_id) & (property_stations >= 0)
+        features[column] = np.bincount(property_stations[rows], weights=values[rows],
+                                       minlength=len(station_ids)).astype(np.int32)
+
+    levels = feed.levels
+    level_index = pd.Series(levels["level_index"].to_numpy(), index=levels["level_id"].astype(str))
+    platforms = stops[(stops["location_type"] == 0)
+                      & stops["parent_station"].astype(str).isin(rapid_transit_parents(stops)["stop_id"].astype(str))]
+    below_street = platforms["level_id"].astype(str).map(level_index).to_numpy() < 0
+    underground = np.zeros(len(station_ids), dtype=bool)
+    underground[station_ids.get_indexer(platforms["parent_station"].astype(str))[below_street]] = True
+
+    def count(name):
+        return features[name] if name in features else 0
+
+    features["Parking"] = count(PARKING_AREA) > 0
+    features["Ramp"] = count("ramp") > 0
+    features["Lift"] = (count("elevator") > 0) | (count("portable-boarding-lift") > 0)
+    features["Underground"] = underground
+    features["Step_Free"] = parents["wheelchair_boarding"].to_numpy() == ACCESSIBLE
+    features.insert(0, "Station", parents["stop_name"].to_numpy())
+    return features
+
+
+def load_station_features(feed=None, build_missing=True):
+    """The cached feature matrix for the feed's current sources"""
+    feed = feed or load_feed()
+    path = os.path.join(feed.cache_dir, f"station-features-v{FEATURES_VERSION}-{feed.version(*SOURCE_TABLES)[:16]}.parquet")
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    if not build_missing:
+        return None
+    features = build_station_features(feed)
+    os.makedirs(feed.cache_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    features.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+    return features
+
+
+def station_amenities(names, feed=None):
+    """Features for the given station names (Station column as passed); unmatched stations get zeros"""
+    feed = feed or load_feed()
+    features = load_station_features(feed).drop(columns="Station")
+    parents = match_parent_stations(names, feed.stops)
+    matched = features.reindex(parents.to_numpy())
+    matched = matched.fillna({column: False if features[column].dtype == bool else 0 for column in features})
+    matched = matched.astype(features.dtypes.to_dict())
+    matched.insert(0, "parent_station", parents.to_numpy())
+    matched.insert(0, "Station", parents.index)
+    return matched.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    features = build_station_features()
+    print(f"{len(features)} stations x {features.shape[1] - 1} features, "
+          f"{features.memory_usage(deep=True).sum() / 1e3:.0f} kB")
+    print(features[list(SUMMARY_COLUMNS)].sum().to_string())
@@ -0,0 +1,249 @@
+"""Columnar loader for the GTFS text files.
+
+Every table is parsed once into explicit dtypes and cached as Feather under
+DATA/gtfs/; later loads memory-map the cache. Column types follow the GTFS
+column name, whichever file it appears in:
+
+    IDs (*_id, parent_station, ...)    category
+    flags and enums                    int32, blank -> 0 (GTFS's default)
+    counts and sort orders             int32, blank -> -1
+    clock times (HH:MM:SS)             int32 seconds after midnight, blank -> -1
+    dates (YYYYMMDD)                   int32 as written, blank -> -1
+    coordinates, lengths, durations    float32, blank -> NaN
+    anything else                      string
+
+A cache entry is reused while the source file's size and mtime are
+unchanged; if only the mtime moved (a fresh checkout), the content hash
+decides. Tables already in memory are held with their source hash and
+re-read when the file changes, so they always agree with version(). Each
+access costs one os.stat; the stamp is only read, and the file only
+hashed, when the size or mtime differs from the last check.
+
+    feed = load_feed()
+    feed.stops            # parsed (or read from cache) on first access only
+    python3 -m gtfs.feed  # build every cache and report cold / warm timings
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from network.core import ARTIFACT_DIR, DATA_DIR
+
+GTFS_DIR = os.getenv("MBTA_GTFS_DIR", os.path.join(DATA_DIR, "MBTA_GTFS_OfficialOnlineDataset"))
+CACHE_DIR = os.path.join(ARTIFACT_DIR, "gtfs")
+# Bump when the parsing rules below change; every cache entry is then rebuilt
+SCHEMA_VERSION = 1
+
+MISSING = -1
+
+ID_COLUMNS = {
+    "parent_station", "stop_code", "zone_id", "block_id", "platform_code", "facility_code",
+    "fare_product_id", "filter_fare_product_id",
+}
+FLAG_COLUMNS = {
+    "location_type", "wheelchair_boarding", "vehicle_type", "route_type", "listed_route",
+    "direction_id", "wheelchair_accessible", "bikes_allowed", "trip_route_type",
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+    "exception_type", "service_schedule_typicality", "transfer_type", "wheelchair_transfer",
+    "pathway_mode", "is_bidirectional", "facility_class", "wheelchair_facility",
+    "fare_media_type", "duration_limit_type", "fare_transfer_type", "fare_media_behavior",
+    "fare_product_behavior", "transfer_only", "route_pattern_typicality", "canonical_route_pattern",
+    "pickup_type", "drop_off_type", "timepoint",
+    "trip_updates", "vehicle_positions", "service_alerts", "authentication_type",
+}
+INT_COLUMNS = {
+    "route_sort_order", "line_sort_order", "route_pattern_sort_order", "stop_sequence",
+    "transfer_count", "stair_count", "duration_limit",
+}
+FLOAT_COLUMNS = {
+    "stop_lat", "stop_lon", "facility_lat", "facility_lon", "shape_pt_lat", "shape_pt_lon",
+    "shape_dist_traveled", "length", "wheelchair_length", "traversal_time", "wheelchair_traversal_time",
+    "max_slope", "min_width", "min_transfer_time", "min_walk_time", "min_wheelchair_time",
+    "suggested_buffer_time", "amount", "level_index", "level_elevation",
+}
+TIME_COLUMNS = {"arrival_time", "departure_time", "start_time", "end_time"}
+DATE_COLUMNS = {
+    "date", "start_date", "end_date", "rating_start_date", "rating_end_date",
+    "feed_start_date", "feed_end_date",
+}
+
+
+def column_kind(name):
+    for kind, columns in (("flag", FLAG_COLUMNS), ("int", INT_COLUMNS), ("float", FLOAT_COLUMNS),
+                          ("time", TIME_COLUMNS), ("date", DATE_COLUMNS), ("id", ID_COLUMNS)):
+        if name in columns:
+            return kind
+    return "id" if name.endswith("_id") else "text"
+
+
+def parse_times(values):
+    """HH:MM:SS (hours may pass 24) to int32 seconds after midnight; blank -> MISSING"""
+    parts = values.str.split(":", expand=True)
+    if parts.shape[1] < 3:
+        return np.full(len(values), MISSING, dtype=np.int32)
+    seconds = (pd.to_numeric(parts[0]) * 3600 + pd.to_numeric(parts[1]) * 60 + pd.to_numeric(parts[2]))
+    return seconds.fillna(MISSING).astype(np.int32).to_numpy()
+
+
+def convert_column(name, values):
+    """A column read as text, in the dtype its GTFS name calls for"""
+    kind = column_kind(name)
+    if kind == "id":
+        return values.astype("category")
+    if kind == "text":
+        return values.astype("string")
+    if kind == "time":
+        return parse_times(values)
+    numbers = pd.to_numeric(values)
+    if kind == "float":
+        return numbers.astype(np.float32)
+    return numbers.fillna(0 if kind == "flag" else MISSING).astype(np.int32)
+
+
+def read_table(path):
+    """Parse one GTFS file into typed columns"""
+    raw = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""], encoding="utf-8-sig")
+    return pd.DataFrame({name: convert_column(name, raw[name]) for name in raw.columns})
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class GTFSFeed:
+    """Lazily loaded GTFS tables; feed.table("stops") or feed.stops"""
+
+    def __init__(self, path=GTFS_DIR, cache_dir=CACHE_DIR):
+        self.path = path
+        self.cache_dir = cache_dir
+        self._tables = {}
+        self._states = {}   # name -> ((size, mtime_ns), source state) from the last check
+        self._lock = threading.Lock()
+
+    @property
+    def table_names(self):
+        return sorted(name[:-4] for name in os.listdir(self.path) if name.endswith(".txt"))
+
+    def has_table(self, name):
+        return os.path.exists(self._source(name))
+
+    def table(self, name):
+        """The parsed table, re-read if the source changed since; KeyError if the feed has no such file"""
+        if not self.has_table(name):
+            raise KeyError(f"GTFS feed has no {name}.txt")
+        state = self._current_state(name)
+        entry = self._tables.get(name)   # (source sha1, table)
+        if entry is None or entry[0] != state["sha1"]:
+            with self._lock:
+                entry = self._tables.get(name)
+                if entry is None or entry[0] != state["sha1"]:
+                    entry = self._tables[name] = (state["sha1"], self._load(name, state))
+        return entry[1]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self.table(name)
+        except KeyError as e:
+            raise AttributeError(e.args[0]) from None
+
+    def load_all(self):
+        return {name: self.table(name) for name in self.table_names}
+
+    def version(self, *names):
+        """Hash of the given source files (all of them by default), for keying derived artifacts"""
+        digest = hashlib.sha1(f"gtfs-v{SCHEMA_VERSION}".encode())
+        for name in names or self.table_names:
+            digest.update(name.encode())
+            digest.update(self._current_state(name)["sha1"].encode())
+        return digest.hexdigest()
+
+    def _source(self, name):
+        return os.path.join(self.path, f"{name}.txt")
+
+    def _cache_paths(self, name):
+        base = os.path.join(self.cache_dir, name)
+        return f"{base}.feather", f"{base}.json"
+
+    def _current_state(self, name):
+        """_source_state, reused while the source's size and mtime are what they were at the last check"""
+        stat = os.stat(self._source(name))
+        key = (stat.st_size, stat.st_mtime_ns)
+        memo = self._states.get(name)
+        if memo is None or memo[0] != key:
+            memo = self._states[name] = (key, self._source_state(name, stat))
+        return memo[1]
+
+    def _source_state(self, name, stat):
+        """size / mtime / sha1 of the source, hashing only when the cached stamp no longer matches"""
+        state = {"schema": SCHEMA_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        stamp = self._read_stamp(name)
+        if stamp and all(stamp.get(key) == value for key, value in state.items()):
+            state["sha1"] = stamp["sha1"]
+        else:
+            state["sha1"] = file_digest(self._source(name))
+        return state
+
+    def _read_stamp(self, name):
+        try:
+            with open(self._cache_paths(name)[1]) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load(self, name, state):
+        data_path, stamp_path = self._cache_paths(name)
+        stamp = self._read_stamp(name)
+        if stamp and stamp.get("schema") == SCHEMA_VERSION and stamp.get("sha1") == state["sha1"] \
+                and os.path.exists(data_path):
+            if stamp != state:
+                self._write_stamp(stamp_path, state)
+            return feather.read_feather(data_path, memory_map=True)
+
+        table = read_table(self._source(name))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{data_path}.tmp-{os.getpid()}"
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, data_path)
+        self._write_stamp(stamp_path, state)
+        return table
+
+    @staticmethod
+    def _write_stamp(path, state):
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+def load_feed(path=GTFS_DIR, cache_dir=CACHE_DIR):
+    """The process-wide feed object for a GTFS directory"""
+    key = (os.path.abspath(path), os.path.abspath(cache_dir))
+    with _feeds_lock:
+        feed = _feeds.get(key)
+        if feed is None:
+            feed = _feeds[key] = GTFSFeed(path, cache_dir)
+    return feed
+
+
+if __name__ == "__main__":
+    for label in ("cold" if not os.path.isdir(CACHE_DIR) else "refresh", "warm"):
+        feed = GTFSFeed()
+        started = time.perf_counter()
+        tables = feed.load_all()
+        elapsed = time.perf_counter() - started
+        rows = sum(len(df) for df in tables.values())
+        memory = sum(df.memory_usage(deep=True).sum() for df in tables.values())
+        print(f"{label:>7}: {len(tables)} tables, {rows} rows, {memory / 1e6:.1f} MB in {elapsed * 1000:.0f} ms")
@@ -0,0 +1,62 @@
+"""Map geometry for the whole GTFS feed: every stop and every route's shapes.
+
+Stops are the points a rider sees on a map: parent stations and stops that
+have no parent (platforms, entrances and pathway nodes are drawn as their
+station). Each route's shapes are stacked into one pair of lon / lat arrays
+with a NaN between shapes, so a full feed (hundreds of routes) is one
+trace per route rather than one per shape or segment. Feeds without
+shapes.txt (such as MBTA_GTFS_OfficialOnlineDataset) have stops only.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_ROUTE_COLOR = "#95a5a6"
+
+
+def stop_points(stops):
+    """stop_name, x (lon), y (lat) for parent stations and unparented stops with coordinates"""
+    visible = stops[stops["location_type"].isin((0, 1)) & stops["parent_station"].isna()]
+    visible = visible.dropna(subset=["stop_lat", "stop_lon"])
+    return pd.DataFrame({
+        "stop_name": visible["stop_name"].astype(str).to_numpy(),
+        "x": visible["stop_lon"].to_numpy(),
+        "y": visible["stop_lat"].to_numpy(),
+    })
+
+
+def route_shape_coordinates(routes, trips, shapes):
+    """Per route_id, (label, colour, x, y) with NaN between that route's shapes"""
+    shape_routes = (trips.dropna(subset=["shape_id"])
+                    .astype({"shape_id": str, "route_id": str})
+                    .drop_duplicates("shape_id")[["shape_id", "route_id"]])
+    points = (shapes[["shape_id", "shape_pt_sequence", "shape_pt_lon", "shape_pt_lat"]]
+              .astype({"shape_id": str})
+              .merge(shape_routes, on="shape_id")
+              .sort_values(["route_id", "shape_id", "shape_pt_sequence"]))
+
+    routes = routes.astype({"route_id": str}).set_index("route_id")
+    coordinates = {}
+    for route_id, group in points.groupby("route_id", sort=False):
+        # A NaN after the last point of each shape breaks the line between shapes
+        breaks = np.flatnonzero(group["shape_id"].to_numpy()[1:] != group["shape_id"].to_numpy()[:-1]) + 1
+        x = np.insert(group["shape_pt_lon"].to_numpy(np.float64), breaks, np.nan)
+        y = np.insert(group["shape_pt_lat"].to_numpy(np.float64), breaks, np.nan)
+        coordinates[route_id] = (route_label(routes, route_id), route_color(routes, route_id), x, y)
+    return coordinates
+
+
+def route_label(routes, route_id):
+    if route_id not in routes.index:
+        return route_id
+    row = routes.loc[route_id]
+    for column in ("route_short_name", "route_long_name"):
+        if column in routes.columns and pd.notna(row[column]):
+            return str(row[column])
+    return route_id
+
+
+def route_color(routes, route_id):
+    if "route_color" not in routes.columns or route_id not in routes.index:
+        return DEFAULT_ROUTE_COLOR
+    color = routes.loc[route_id, "route_color"]
+    return f"#{color}" if pd.notna(color) else DEFAULT_ROUTE_COLOR
@@ -0,0 +1,35 @@
+"""Matching the project's station names (connections.csv) to GTFS parent stations.
+
+The derived CSVs use older or longer names ("Porter Square", "New England
+Medical Center", "St. Paul Street (1)"); the feed uses current ones
+("Porter", "Tufts Medical Center", "Saint Paul Street"). Names are compared
+by network.names.normalize_station_name, the key the API and pages use.
+Stations closed since (Pleasant Street, Boston University West) have no
+match.
+"""
+import pandas as pd
+
+from network.names import normalize_station_name
+
+RAPID_TRANSIT_VEHICLES = (0, 1)   # light rail, subway
+
+
+def rapid_transit_parents(stops):
+    """Parent stations with at least one light-rail or subway platform"""
+    platforms = stops[(stops["location_type"] == 0) & stops["vehicle_type"].isin(RAPID_TRANSIT_VEHICLES)]
+    parents = stops[stops["location_type"] == 1]
+    return parents[parents["stop_id"].astype(str).isin(platforms["parent_station"].astype(str))]
+
+
+def match_parent_stations(names, stops):
+    """Parent stop_id for each name (index = names), NaN where nothing matches; rapid transit wins ties"""
+    parents = stops[stops["location_type"] == 1]
+    preferred = set(rapid_transit_parents(stops)["stop_id"].astype(str))
+    candidates = pd.DataFrame({
+        "key": parents["stop_name"].map(normalize_station_name).to_numpy(),
+        "stop_id": parents["stop_id"].astype(str).to_numpy(),
+    })
+    candidates["rank"] = ~candidates["stop_id"].isin(preferred)
+    best = candidates.sort_values(["rank", "stop_id"]).drop_duplicates("key").set_index("key")["stop_id"]
+    names = pd.Index(names)
+    return pd.Series(best.reindex(names.map(normalize_station_name)).to_numpy(), index=names, name="parent_station")
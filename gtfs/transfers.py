@@ -0,0 +1,245 @@
+"""Platform-to-platform walking times inside station complexes.
+
+A complex is a parent station (location_type 1) and every stop whose
+parent_station points at it: platforms, entrances, and the generic nodes
+pathways.txt connects. Each pathway gets a walking time and, when it is
+step-free, a wheelchair time:
+
+    walkway         length at WALK_SPEED (wheelchair_length at WHEELCHAIR_SPEED)
+    stairs          stair_count steps at STAIR_SECONDS; no wheelchair time
+    escalator       traversal_time; no wheelchair time
+    elevator        traversal_time (wheelchair_traversal_time)
+    fare/exit gate  GATE_SECONDS
+
+One Dijkstra per complex, over that complex's nodes only and bounded at
+MAX_WALK_SECONDS, gives every platform-to-platform time. Where transfers.txt
+states min_walk_time / min_wheelchair_time for a pair, those win; pairs it
+marks as impossible (transfer_type 3) are dropped.
+
+The result is a TransferTable: one row per ordered platform pair, stop ids
+as int32 codes, times as float32 seconds (NaN when there is no step-free
+route), sorted so lookups are a binary search.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from gtfs.feed import load_feed
+from gtfs.stations import match_parent_stations
+
+WALK_SPEED = 1.4         # m/s; both speeds fitted to the min_walk_time / min_wheelchair_time transfers.txt states
+WHEELCHAIR_SPEED = 1.05  # m/s
+STAIR_SECONDS = 0.8      # per step
+GATE_SECONDS = 5.0
+MAX_WALK_SECONDS = 900.0
+
+WALKWAY, STAIRS, MOVING_SIDEWALK, ESCALATOR, ELEVATOR, FARE_GATE, EXIT_GATE = range(1, 8)
+PLATFORM, STATION = 0, 1
+NOT_POSSIBLE = 3
+
+COLUMNS = ("parent_station", "from_stop_id", "to_stop_id", "walk_seconds", "wheelchair_seconds",
+           "transfer_seconds", "from_feed")
+
+
+def pathway_seconds(pathways):
+    """(walk, wheelchair) seconds per pathway row; wheelchair is NaN where not step-free"""
+    mode = pathways["pathway_mode"].to_numpy()
+    length = pathways["length"].to_numpy(np.float64)
+    wheelchair_length = pathways["wheelchair_length"].fillna(pathways["length"]).to_numpy(np.float64)
+    traversal = pathways["traversal_time"].to_numpy(np.float64)
+    wheelchair_traversal = pathways["wheelchair_traversal_time"].fillna(pathways["traversal_time"]).to_numpy(np.float64)
+    stairs = pathways["stair_count"].to_numpy(np.float64)
+
+    walk = np.select(
+        [np.isfinite(traversal), np.isin(mode, (WALKWAY, MOVING_SIDEWALK)), mode == STAIRS,
+         np.isin(mode, (FARE_GATE, EXIT_GATE))],
+        [traversal, length / WALK_SPEED, np.abs(stairs) * STAIR_SECONDS, GATE_SECONDS],
+        default=np.nan,
+    )
+    wheelchair = np.select(
+        [np.isin(mode, (STAIRS, ESCALATOR)), np.isfinite(wheelchair_traversal),
+         np.isin(mode, (WALKWAY, MOVING_SIDEWALK)), np.isin(mode, (FARE_GATE, EXIT_GATE))],
+        [np.nan, wheelchair_traversal, wheelchair_length / WHEELCHAIR_SPEED, GATE_SECONDS],
+        default=np.nan,
+    )
+    return walk, wheelchair
+
+
+def complex_walk_times(stops, pathways, max_seconds=MAX_WALK_SECONDS):
+    """Pathway-derived walking times between platforms of the same parent station"""
+    parents = stops["parent_station"].astype(str).to_numpy()
+    stop_ids = pd.Index(stops["stop_id"].astype(str))
+    src = stop_ids.get_indexer(pathways["from_stop_id"].astype(str))
+    dst = stop_ids.get_indexer(pathways["to_stop_id"].astype(str))
+    walk, wheelchair = pathway_seconds(pathways)
+    both_ways = pathways["is_bidirectional"].to_numpy() == 1
+    src, dst = np.concatenate([src, dst[both_ways]]), np.concatenate([dst, src[both_ways]])
+    walk, wheelchair = np.concatenate([walk, walk[both_ways]]), np.concatenate([wheelchair, wheelchair[both_ways]])
+    known = (src >= 0) & (dst >= 0) & (parents[np.maximum(src, 0)] == parents[np.maximum(dst, 0)])
+    src, dst, walk, wheelchair = src[known], dst[known], walk[known], wheelchair[known]
+
+    is_platform = stops["location_type"].to_numpy() == PLATFORM
+    rows = []
+    for parent, edge_rows in pd.Series(np.arange(len(src))).groupby(parents[src]).groups.items():
+        nodes = np.flatnonzero(parents == parent)
+        platforms = nodes[is_platform[nodes]]
+        if len(platforms) < 2:
+            continue
+        local = pd.Index(nodes)
+        u, v = local.get_indexer(src[edge_rows]), local.get_indexer(dst[edge_rows])
+        starts = local.get_indexer(platforms)
+        times = []
+        for seconds in (walk[edge_rows], wheelchair[edge_rows]):
+            usable = np.isfinite(seconds)
+            # +epsilon keeps zero-second pathways as edges in the sparse matrix
+            graph = csr_matrix((seconds[usable] + 1e-6, (u[usable], v[usable])), shape=(len(nodes), len(nodes)))
+            times.append(dijkstra(graph, directed=True, indices=starts, limit=max_seconds)[:, starts])
+        a, b = np.nonzero(~np.eye(len(platforms), dtype=bool) & np.isfinite(times[0]))
+        rows.append(pd.DataFrame({
+            "parent_station": parent,
+            "from_stop_id": stop_ids[platforms[a]],
+            "to_stop_id": stop_ids[platforms[b]],
+            "walk_seconds": np.round(times[0][a, b], 1),
+            "wheelchair_seconds": np.round(np.where(np.isfinite(times[1][a, b]), times[1][a, b], np.nan), 1),
+        }))
+    if not rows:
+        return pd.DataFrame(columns=["parent_station", "from_stop_id", "to_stop_id", "walk_seconds",
+                                     "wheelchair_seconds"])
+    return pd.concat(rows, ignore_index=True)
+
+
+def build_transfer_table(feed=None, max_seconds=MAX_WALK_SECONDS):
+    """Walking-time rows for every platform pair in every complex, feed values taking precedence"""
+    feed = feed or load_feed()
+    stops = feed.stops
+    walks = complex_walk_times(stops, feed.pathways, max_seconds)
+
+    transfers = feed.transfers
+    transfers = transfers[transfers["from_trip_id"].isna() & transfers["to_trip_id"].isna()]
+    parent_of = stops.assign(stop_id=stops["stop_id"].astype(str)).set_index("stop_id")["parent_station"].astype(str)
+    stated = pd.DataFrame({
+        "from_stop_id": transfers["from_stop_id"].astype(str).to_numpy(),
+        "to_stop_id": transfers["to_stop_id"].astype(str).to_numpy(),
+        "transfer_type": transfers["transfer_type"].to_numpy(),
+        "feed_walk": transfers["min_walk_time"].to_numpy(np.float64),
+        "feed_wheelchair": transfers["min_wheelchair_time"].to_numpy(np.float64),
+        "transfer_seconds": transfers["min_transfer_time"].to_numpy(np.float64),
+    })
+    stated["parent_station"] = stated["from_stop_id"].map(parent_of)
+    stated = stated[stated["parent_station"].notna() & (stated["parent_station"] != "nan")
+                    & (stated["from_stop_id"] != stated["to_stop_id"])]
+
+    table = walks.merge(stated, on=["parent_station", "from_stop_id", "to_stop_id"], how="outer")
+    table = table[table["transfer_type"] != NOT_POSSIBLE]
+    table["from_feed"] = table["feed_walk"].notna()
+    table["walk_seconds"] = table["feed_walk"].fillna(table["walk_seconds"])
+    table["wheelchair_seconds"] = table["feed_wheelchair"].where(table["from_feed"], table["wheelchair_seconds"])
+    table = table[table["walk_seconds"].notna()]
+    return TransferTable(table[list(COLUMNS)])
+
+
+class TransferTable:
+    """Compact platform-pair lookup: stop ids as int32 codes, times as float32 seconds"""
+
+    def __init__(self, df):
+        self.stop_ids = pd.Index(sorted(set(df["from_stop_id"]) | set(df["to_stop_id"])), name="stop_id")
+        from_codes = self.stop_ids.get_indexer(df["from_stop_id"]).astype(np.int32)
+        to_codes = self.stop_ids.get_indexer(df["to_stop_id"]).astype(np.int32)
+        keys = from_codes.astype(np.int64) * len(self.stop_ids) + to_codes
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self.from_codes = from_codes[order]
+        self.to_codes = to_codes[order]
+        self.parent_station = pd.Categorical(df["parent_station"].to_numpy()[order])
+        self.walk_seconds = df["walk_seconds"].to_numpy(np.float32)[order]
+        self.wheelchair_seconds = df["wheelchair_seconds"].to_numpy(np.float32)[order]
+        self.transfer_seconds = df["transfer_seconds"].to_numpy(np.float32)[order]
+        self.from_feed = df["from_feed"].to_numpy(bool)[order]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def lookup(self, from_stop_ids, to_stop_ids, wheelchair=False):
+        """Seconds for each (from, to) pair, vectorized; NaN for unknown or impossible pairs"""
+        n = len(self.stop_ids)
+        a = self.stop_ids.get_indexer(pd.Index(from_stop_ids, dtype=object).astype(str))
+        b = self.stop_ids.get_indexer(pd.Index(to_stop_ids, dtype=object).astype(str))
+        keys = a.astype(np.int64) * n + b
+        positions = np.minimum(np.searchsorted(self._keys, keys), max(len(self._keys) - 1, 0))
+        found = (a >= 0) & (b >= 0) & (len(self._keys) > 0)
+        found &= self._keys[positions] == keys if len(self._keys) else False
+        seconds = self.wheelchair_seconds if wheelchair else self.walk_seconds
+        return np.where(found, seconds[positions] if len(self._keys) else np.nan, np.nan).astype(np.float32)
+
+    def walk_time(self, from_stop_id, to_stop_id, wheelchair=False):
+        """Seconds between two platforms, or None"""
+        seconds = self.lookup([from_stop_id], [to_stop_id], wheelchair)[0]
+        return None if np.isnan(seconds) else float(seconds)
+
+    def to_frame(self):
+        return pd.DataFrame({
+            "parent_station": self.parent_station,
+            "from_stop_id": self.stop_ids[self.from_codes],
+            "to_stop_id": self.stop_ids[self.to_codes],
+            "walk_seconds": self.walk_seconds,
+            "wheelchair_seconds": self.wheelchair_seconds,
+            "transfer_seconds": self.transfer_seconds,
+            "from_feed": self.from_feed,
+        })
+
+    def station_summary(self, stops=None):
+        """Per parent station: platform pairs, median / max walk and wheelchair seconds, step-free share"""
+        df = self.to_frame()
+        summary = df.groupby("parent_station", observed=True).agg(
+            Pairs=("walk_seconds", "size"),
+            Median_Walk_Seconds=("walk_seconds", "median"),
+            Max_Walk_Seconds=("walk_seconds", "max"),
+            Median_Wheelchair_Seconds=("wheelchair_seconds", "median"),
+            Step_Free_Share=("wheelchair_seconds", lambda s: s.notna().mean()),
+        )
+        if stops is not None:
+            names = stops.assign(stop_id=stops["stop_id"].astype(str)).set_index("stop_id")["stop_name"]
+            summary.insert(0, "Station", names.reindex(summary.index.astype(str)).to_numpy())
+        return summary
+
+    def transfer_minutes_by_station(self, stops, names, wheelchair=False):
+        """Median platform-to-platform minutes for the given station names, matched to their parent station"""
+        column = "Median_Wheelchair_Seconds" if wheelchair else "Median_Walk_Seconds"
+        seconds = self.station_summary()[column]
+        parents = match_parent_stations(names, stops)
+        minutes = pd.Series(seconds.reindex(parents.to_numpy()).to_numpy() / 60, index=parents.index)
+        return minutes.dropna().rename("Transfer_Minutes")
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        self.to_frame().to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        return cls(pd.read_parquet(path))
+
+
+def load_transfer_table(feed=None, build_missing=True):
+    """The table for the feed's current stops / pathways / transfers, cached as Parquet beside the feed cache"""
+    feed = feed or load_feed()
+    path = os.path.join(feed.cache_dir, f"transfers-{feed.version('stops', 'pathways', 'transfers')[:16]}.parquet")
+    if os.path.exists(path):
+        return TransferTable.load(path)
+    if not build_missing:
+        return None
+    table = build_transfer_table(feed)
+    os.makedirs(feed.cache_dir, exist_ok=True)
+    table.save(path)
+    return table
+
+
+if __name__ == "__main__":
+    feed = load_feed()
+    table = build_transfer_table(feed)
+    print(f"{len(table)} platform pairs in {table.parent_station.categories.size} complexes "
+          f"({table.from_feed.mean():.0%} from transfers.txt, the rest from pathways)")
+    print(table.station_summary(feed.stops).sort_values("Max_Walk_Seconds", ascending=False).head(10).round(1))
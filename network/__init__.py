@@ -0,0 +1 @@
+"""Shared subway-network computations used by the Streamlit pages"""
@@ -0,0 +1,298 @@
+"""Offline analytics bundle read by the Streamlit pages.
+
+Everything the analytics and amenities pages used to compute while
+rendering is produced here ahead of time, into one directory per version
+of the input CSVs:
+
+    DATA/analytics-<version>/
+        manifest.json             versions, row counts and headline numbers
+        line_stats.parquet        per-line connection statistics
+        centrality.parquet        degree / betweenness / closeness per station
+        avg_travel_times.parquet  mean shortest travel time from each station
+        efficiency.parquet        per-station mean / eccentricity / efficiency
+        travel_times.arrow        all-pairs minutes, row-major float32 (Arrow IPC)
+        two_way_travel_times.arrow  the same over network.two_way (the what-if base)
+        locations.parquet         station coordinates joined with centrality
+        station_amenities.parquet lines served and amenities per station (from the GTFS facilities)
+
+Parquet tables are decoded into pandas on first access (a copy, once per
+bundle object); the Arrow matrices are memory-mapped and read zero-copy, so the
+largest artifacts are never copied. The input version is recomputed only for
+files whose size or mtime changed, so checking it on every rerun is cheap.
+
+    python3 -m network.analytics          # build the bundle for the current inputs
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from scipy.sparse.csgraph import shortest_path
+
+from gtfs.facilities import SOURCE_TABLES as FACILITY_TABLES, station_amenities
+from gtfs.feed import load_feed
+from network.centrality import artifact_path, compute_centrality, save_centrality
+from network.core import ARTIFACT_DIR, DATA_DIR, file_sha1, load_network
+
+FORMAT_VERSION = 4
+INPUT_FILES = ("connections.csv", "locations.csv")
+TABLES = ("line_stats", "centrality", "avg_travel_times", "efficiency", "locations", "station_amenities")
+MATRICES = ("travel_times", "two_way_travel_times")
+# Rows of the travel-time matrix reduced at once; bounds the float64 temporaries
+EFFICIENCY_BLOCK_ROWS = 1024
+
+
+def inputs_version(data_dir=DATA_DIR, feed=None):
+    """Hash of every input CSV, the GTFS facility sources and the bundle format"""
+    digest = hashlib.sha1(f"analytics-v{FORMAT_VERSION}".encode())
+    for name in INPUT_FILES:
+        digest.update(name.encode())
+        digest.update(file_sha1(os.path.join(data_dir, name)).encode())
+    digest.update((feed or load_feed()).version(*FACILITY_TABLES).encode())
+    return digest.hexdigest()
+
+
+def bundle_dir(version, artifact_dir=ARTIFACT_DIR):
+    return os.path.join(artifact_dir, f"analytics-{version[:16]}")
+
+
+def compute_line_stats(edges):
+    line_stats = edges.groupby("Color").agg({
+        "Minutes": ["count", "mean", "min", "max", "sum"],
+        "From": "nunique",
+        "To": "nunique"
+    }).round(2)
+    line_stats.columns = ["Connections", "Avg_Time", "Min_Time", "Max_Time", "Total_Time", "Unique_From", "Unique_To"]
+    line_stats["Stations"] = line_stats[["Unique_From", "Unique_To"]].max(axis=1)
+    line_stats["Efficiency"] = line_stats["Total_Time"] / line_stats["Connections"]
+    return line_stats
+
+
+def compute_travel_times(network):
+    """Dense all-pairs minutes (inf where unreachable), station-id order"""
+    return shortest_path(network.csr_matrix(), method="D", directed=True).astype(np.float32)
+
+
+def compute_efficiency(stations, travel_times, block_rows=EFFICIENCY_BLOCK_ROWS):
+    """Per-station reductions of the all-pairs matrix, one row per station in matrix order.
+
+    Reachable             other stations reachable from this one
+    Average_Minutes       mean travel time to them (NaN if none)
+    Eccentricity_Minutes  travel time to the farthest of them (NaN if none)
+    Efficiency            sum of 1 / minutes over all other stations, / (n - 1)
+    """
+    n = len(stations)
+    reachable = np.zeros(n, dtype=np.int64)
+    total = np.zeros(n)
+    eccentricity = np.full(n, np.nan)
+    inverse = np.zeros(n)
+    for start in range(0, n, block_rows):
+        block = travel_times[start:start + block_rows]
+        rows = np.arange(len(block))
+        finite = np.isfinite(block)
+        finite[rows, start + rows] = False
+        minutes = np.where(finite, block, 0.0)
+        reachable[start:start + len(block)] = finite.sum(axis=1)
+        total[start:start + len(block)] = minutes.sum(axis=1)
+        eccentricity[start:start + len(block)] = np.where(finite, block, -np.inf).max(axis=1)
+        with np.errstate(divide="ignore"):
+            inverse[start:start + len(block)] = np.where(finite & (minutes > 0), 1.0 / minutes, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore"):
+        average = total / reachable
+    eccentricity[reachable == 0] = np.nan
+    return pd.DataFrame({
+        "Station": pd.Categorical(stations, categories=stations),
+        "Reachable": reachable,
+        "Average_Minutes": average,
+        "Eccentricity_Minutes": eccentricity,
+        "Efficiency": inverse / max(n - 1, 1),
+    })
+
+
+def efficiency_summary(efficiency):
+    """Network-wide numbers from the per-station table.
+
+    Diameter and mean path length are over reachable pairs only (connections
+    are directed, so many pairs are not); global efficiency counts
+    unreachable pairs as zero.
+    """
+    connected = efficiency[efficiency["Reachable"] > 0]
+    pairs = int(efficiency["Reachable"].sum())
+    return {
+        "diameter_minutes": float(connected["Eccentricity_Minutes"].max()) if pairs else 0.0,
+        "reachable_pair_share": pairs / max(len(efficiency) * (len(efficiency) - 1), 1),
+        "avg_shortest_path_minutes": float((connected["Average_Minutes"] * connected["Reachable"]).sum() / pairs)
+        if pairs else 0.0,
+        "global_efficiency": float(efficiency["Efficiency"].mean()) if len(efficiency) else 0.0,
+    }
+
+
+def compute_avg_travel_times(efficiency):
+    return (efficiency[["Station", "Average_Minutes"]]
+            .astype({"Station": str})
+            .dropna()
+            .sort_values("Average_Minutes")
+            .reset_index(drop=True))
+
+
+def compute_locations(locations_df, centrality_df):
+    return locations_df.merge(centrality_df, left_on="Station Name", right_on="Station", how="left")
+
+
+def compute_station_amenities(edges, amenities_df):
+    """Lines serving each station, merged with its amenities (gtfs.facilities.station_amenities)"""
+    station_lines = pd.concat([
+        edges[['From', 'Color']].rename(columns={'From': 'Station'}),
+        edges[['To', 'Color']].rename(columns={'To': 'Station'})
+    ]).drop_duplicates()
+    grouped = station_lines.groupby('Station')['Color'].agg(lambda x: sorted(set(x))).reset_index()
+    grouped.columns = ['Station', 'Lines']
+    grouped['Line_Count'] = grouped['Lines'].apply(len)
+    grouped['Lines_Str'] = grouped['Lines'].apply(lambda x: ', '.join(line.title() for line in x))
+    return grouped.merge(amenities_df, on='Station', how='left')
+
+
+def build_bundle(data_dir=DATA_DIR, artifact_dir=ARTIFACT_DIR):
+    """Compute every table for the current inputs and write the bundle; returns its directory"""
+    version = inputs_version(data_dir)
+    network = load_network(os.path.join(data_dir, "connections.csv"))
+    locations_df = pd.read_csv(os.path.join(data_dir, "locations.csv"))
+    amenities_df = station_amenities(network.stations)
+
+    centrality_df = compute_centrality(network)
+    # Also the standalone artifact that network.approximate falls back to
+    save_centrality(centrality_df, artifact_path(network.version, artifact_dir))
+    travel_times = compute_travel_times(network)
+    matrices = {"travel_times": travel_times, "two_way_travel_times": compute_travel_times(network.two_way)}
+    efficiency = compute_efficiency(network.stations, travel_times)
+    tables = {
+        "line_stats": compute_line_stats(network.edges).reset_index(),
+        "centrality": centrality_df,
+        "avg_travel_times": compute_avg_travel_times(efficiency),
+        "efficiency": efficiency,
+        "locations": compute_locations(locations_df, centrality_df),
+        "station_amenities": compute_station_amenities(network.edges, amenities_df),
+    }
+    G = network.graph
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "version": version,
+        "connections_version": network.version,
+        "built_at": time.time(),
+        "stations": list(network.stations),
+        "summary": {
+            "total_stations": G.number_of_nodes(),
+            "total_connections": G.number_of_edges(),
+            "avg_degree": sum(d for _, d in G.degree()) / max(G.number_of_nodes(), 1),
+            **efficiency_summary(efficiency),
+        },
+        "rows": {name: len(df) for name, df in tables.items()},
+    }
+
+    # Build into a scratch directory and rename, so readers never see half a bundle
+    final_dir = bundle_dir(version, artifact_dir)
+    tmp_dir = f"{final_dir}.tmp-{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+    for name, df in tables.items():
+        df.to_parquet(os.path.join(tmp_dir, f"{name}.parquet"), index=False)
+    for name, minutes in matrices.items():
+        matrix = pa.table({"minutes": minutes.ravel()})
+        with pa.OSFile(os.path.join(tmp_dir, f"{name}.arrow"), "wb") as sink:
+            with pa.ipc.new_file(sink, matrix.schema) as writer:
+                writer.write_table(matrix)
+    with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Bundles are content-addressed: if another build for the same inputs landed first, keep it,
+    # since a reader may already have its matrices memory-mapped
+    try:
+        os.rename(tmp_dir, final_dir)
+    except OSError:
+        if not os.path.exists(os.path.join(final_dir, "manifest.json")):
+            raise
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    prune_bundles(final_dir, artifact_dir)
+    return final_dir
+
+
+def prune_bundles(keep_dir, artifact_dir=ARTIFACT_DIR):
+    """Delete every other finished bundle directory (in-progress .tmp-<pid> builds are left alone)"""
+    keep = os.path.basename(keep_dir)
+    for name in os.listdir(artifact_dir):
+        path = os.path.join(artifact_dir, name)
+        if name.startswith("analytics-") and ".tmp-" not in name and name != keep and os.path.isdir(path):
+            # Processes that still map an old bundle keep their open files; the names go away
+            shutil.rmtree(path, ignore_errors=True)
+
+
+class AnalyticsBundle:
+    """Read-only view of a built bundle; tables are loaded on first access"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        self.version = self.manifest["version"]
+        self.summary = self.manifest["summary"]
+        self.stations = pd.Index(self.manifest["stations"], name="Station")
+        self._tables = {}
+        self._matrices = {}
+
+    def table(self, name):
+        if name not in self._tables:
+            path = os.path.join(self.path, f"{name}.parquet")
+            self._tables[name] = pq.read_table(path, memory_map=True).to_pandas()
+        return self._tables[name]
+
+    def station_codes(self, names):
+        """Matrix row / column of each station name (-1 if unknown)"""
+        return self.stations.get_indexer(names)
+
+    def travel_time_block(self, names):
+        """Travel-time submatrix for the given stations, rows and columns in that order"""
+        codes = self.station_codes(names)
+        codes = codes[codes >= 0]
+        return pd.DataFrame(self.travel_times[np.ix_(codes, codes)],
+                            index=self.stations[codes], columns=self.stations[codes])
+
+    def matrix(self, name):
+        """One of MATRICES as an (n, n) float32 array backed by the memory-mapped file"""
+        if name not in self._matrices:
+            source = pa.memory_map(os.path.join(self.path, f"{name}.arrow"))
+            column = pa.ipc.open_file(source).read_all().column("minutes").combine_chunks()
+            n = len(self.stations)
+            self._matrices[name] = column.to_numpy(zero_copy_only=True).reshape(n, n)
+        return self._matrices[name]
+
+    @property
+    def travel_times(self):
+        """All-pairs minutes over the connections as listed (one way)"""
+        return self.matrix("travel_times")
+
+    @property
+    def two_way_travel_times(self):
+        """All-pairs minutes over network.two_way, the base WhatIfEngine expects"""
+        return self.matrix("two_way_travel_times")
+
+
+def load_bundle(data_dir=DATA_DIR, artifact_dir=ARTIFACT_DIR, build_missing=True):
+    """The bundle for the current inputs, building it first if it is missing"""
+    path = bundle_dir(inputs_version(data_dir), artifact_dir)
+    if not os.path.exists(os.path.join(path, "manifest.json")):
+        if not build_missing:
+            return None
+        path = build_bundle(data_dir, artifact_dir)
+    return AnalyticsBundle(path)
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    path = build_bundle()
+    bundle = AnalyticsBundle(path)
+    print(f"Built analytics bundle {bundle.version[:12]} ({', '.join(TABLES + MATRICES)}) "
+          f"in {time.perf_counter() - started:.2f}s -> {path}")
@@ -0,0 +1,129 @@
+"""Sampled (pivot-source) betweenness and closeness with confidence intervals.
+
+Exact centrality needs a shortest-path search from every station. Here only
+k randomly chosen pivots are searched and the per-pivot contributions are
+scaled up by n / k:
+
+    betweenness  Brandes dependencies of the pivots; the interval is a normal
+                 approximation from their per-node variance, with the
+                 finite-population correction so it shrinks to zero at k = n
+    closeness    distances from the pivots to every station (one vectorized
+                 Dijkstra call); the interval is a bootstrap over pivots
+
+estimate_centrality() returns the exact values, with zero-width intervals,
+when the cached artifact for the network's data version is already on
+disk, and the estimate otherwise.
+"""
+import math
+import os
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+from scipy.sparse.csgraph import dijkstra
+
+from network.betweenness import betweenness_moments
+from network.centrality import ARTIFACT_DIR, artifact_path
+
+BOOTSTRAP_ROUNDS = 200
+
+
+def samples_for_error(n, epsilon, confidence=0.95):
+    """Pivots needed so every normalized betweenness is within epsilon with the given confidence.
+
+    Hoeffding's bound with a union bound over the n stations; each pivot's
+    normalized contribution lies in [0, 1].
+    """
+    k = math.ceil(math.log(2 * n / (1 - confidence)) / (2 * epsilon ** 2))
+    return min(n, max(2, k))
+
+
+def sample_pivots(n, samples, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(n, size=min(samples, n), replace=False))
+
+
+def approximate_betweenness(network, pivots, weighted=True, confidence=0.95, processes=None):
+    """(estimate, low, high) arrays of normalized betweenness from the given pivots"""
+    n, k = network.n_stations, len(pivots)
+    weights = network.weights if weighted else None
+    total, total_sq = betweenness_moments(network.indptr, network.indices, weights,
+                                          sources=pivots, processes=processes)
+    mean = total / k
+    variance = np.maximum(total_sq - k * mean ** 2, 0.0) / (k - 1) if k > 1 else np.zeros(n)
+    scale = n / ((n - 1) * (n - 2)) if n > 2 else 1.0
+    estimate = mean * scale
+    half_width = _z(confidence) * np.sqrt(variance / k * (1 - k / n)) * scale
+    return estimate, np.maximum(estimate - half_width, 0.0), estimate + half_width
+
+
+def approximate_closeness(network, pivots, weighted=True, confidence=0.95, seed=0):
+    """(estimate, low, high) arrays of closeness (networkx's inward, Wasserman-Faust form)"""
+    dist = dijkstra(network.csr_matrix(), directed=True, indices=pivots, unweighted=not weighted)
+    reached = np.isfinite(dist)
+    lengths = np.where(reached, dist, 0.0)
+
+    estimate = _closeness(lengths.sum(axis=0), reached.sum(axis=0), len(pivots), network.n_stations)
+    rng = np.random.default_rng(seed)
+    rounds = np.empty((BOOTSTRAP_ROUNDS, network.n_stations))
+    for i in range(BOOTSTRAP_ROUNDS):
+        rows = rng.integers(0, len(pivots), size=len(pivots))
+        rounds[i] = _closeness(lengths[rows].sum(axis=0), reached[rows].sum(axis=0), len(pivots), network.n_stations)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(rounds, [tail, 100 - tail], axis=0)
+    if len(pivots) == network.n_stations:
+        low = high = estimate
+    return estimate, np.minimum(low, estimate), np.maximum(high, estimate)
+
+
+def estimate_centrality(network, samples=None, epsilon=None, confidence=0.95, weighted=True,
+                        seed=0, use_cache=True, artifact_dir=ARTIFACT_DIR, processes=None):
+    """Betweenness and closeness with confidence bounds, one row per station.
+
+    Pass either a pivot count (samples) or a target error for normalized
+    betweenness (epsilon). With use_cache, a current exact artifact wins.
+    """
+    prefix = "Weighted_" if weighted else ""
+    path = artifact_path(network.version, artifact_dir)
+    if use_cache and os.path.exists(path):
+        exact = pd.read_parquet(path).set_index("Station").reindex(network.stations)
+        betweenness = exact[f"{prefix}Betweenness_Centrality"].to_numpy()
+        closeness = exact[f"{prefix}Closeness_Centrality"].to_numpy()
+        return _frame(network, (betweenness,) * 3, (closeness,) * 3, network.n_stations, True)
+
+    n = network.n_stations
+    if samples is None:
+        samples = samples_for_error(n, epsilon or 0.05, confidence)
+    pivots = sample_pivots(n, samples, seed)
+    return _frame(network,
+                  approximate_betweenness(network, pivots, weighted, confidence, processes),
+                  approximate_closeness(network, pivots, weighted, confidence, seed),
+                  len(pivots), len(pivots) == n)
+
+
+def _closeness(total_distance, reached, k, n):
+    # Scale the pivots' sums up to all n stations, then apply networkx's formula
+    scale = n / k
+    total_distance = total_distance * scale
+    others = reached * scale - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        closeness = np.where(total_distance > 0, others / total_distance * others / (n - 1), 0.0)
+    return np.maximum(closeness, 0.0)
+
+
+def _z(confidence):
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def _frame(network, betweenness, closeness, samples, exact):
+    return pd.DataFrame({
+        "Station": network.stations,
+        "Betweenness": betweenness[0],
+        "Betweenness_Low": betweenness[1],
+        "Betweenness_High": betweenness[2],
+        "Closeness": closeness[0],
+        "Closeness_Low": closeness[1],
+        "Closeness_High": closeness[2],
+        "Samples": samples,
+        "Exact": exact,
+    })
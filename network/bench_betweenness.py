@@ -0,0 +1,82 @@
+"""Parallel betweenness benchmark on a GTFS-scale graph.
+
+The official feed in MBTA_GTFS_OfficialOnlineDataset ships stops.txt but no
+stop_times.txt, so the bus network's stop-to-stop links cannot be derived
+from it. As a graph of the same size and shape, every boarding stop is
+linked to its nearest neighbours, with minutes at bus speed. Timings come
+from the same number of Brandes searches that the full bus+subway graph
+would need.
+
+    python3 -m network.bench_betweenness --processes 1 2 4 8 --sources 2000
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from network.betweenness import betweenness
+from network.core import DATA_DIR
+
+STOPS_TXT = os.path.join(DATA_DIR, "MBTA_GTFS_OfficialOnlineDataset", "stops.txt")
+BUS_KMH = 20.0
+KM_PER_DEGREE = 111.2
+
+
+def knn_graph(stops_path=STOPS_TXT, neighbours=4):
+    """CSR (indptr, indices, minutes) linking each boarding stop to its nearest neighbours both ways"""
+    stops = pd.read_csv(stops_path, usecols=["stop_id", "stop_lat", "stop_lon", "location_type"],
+                        dtype={"stop_id": str})
+    stops = stops[stops["location_type"].fillna(0).eq(0)].dropna(subset=["stop_lat", "stop_lon"])
+    # Equirectangular projection is accurate enough at city scale
+    lat = np.radians(stops["stop_lat"].mean())
+    xy = np.column_stack([stops["stop_lon"] * np.cos(lat), stops["stop_lat"]]) * KM_PER_DEGREE
+
+    km, nearest = cKDTree(xy).query(xy, k=neighbours + 1)
+    src = np.repeat(np.arange(len(xy)), neighbours)
+    dst = nearest[:, 1:].ravel()
+    minutes = km[:, 1:].ravel() / BUS_KMH * 60.0
+
+    links = pd.DataFrame({"src": np.concatenate([src, dst]), "dst": np.concatenate([dst, src]),
+                          "minutes": np.concatenate([minutes, minutes])})
+    links = links.groupby(["src", "dst"], as_index=False)["minutes"].min()
+    n = len(xy)
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(links["src"], minlength=n), out=indptr[1:])
+    return indptr, links["dst"].to_numpy(np.int32), links["minutes"].to_numpy(np.float32)
+
+
+def run(process_counts, n_sources, weighted, seed):
+    indptr, indices, weights = knn_graph()
+    n = len(indptr) - 1
+    rng = np.random.default_rng(seed)
+    sources = np.arange(n) if n_sources is None else rng.choice(n, size=min(n_sources, n), replace=False)
+    lengths = weights if weighted else None
+
+    print(f"{n} nodes, {len(indices)} edges, {len(sources)} sources, "
+          f"{'weighted' if weighted else 'unweighted'}, {os.cpu_count()} cores available")
+    baseline = None
+    reference = None
+    for processes in process_counts:
+        started = time.perf_counter()
+        totals = betweenness(indptr, indices, lengths, sources=sources, processes=processes, normalized=False)
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        if reference is None:
+            reference = totals
+        assert np.allclose(totals, reference), "parallel result differs from the first run"
+        projected = elapsed * n / len(sources)
+        print(f"  {processes:3d} processes  {elapsed:8.2f}s  {baseline / elapsed:5.2f}x  "
+              f"(all {n} sources: ~{projected:,.0f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--sources", type=int, default=2000, help="searches to time (0 for every node)")
+    parser.add_argument("--unweighted", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.processes, args.sources or None, not args.unweighted, args.seed)
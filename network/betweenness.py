@@ -0,0 +1,172 @@
+"""Exact betweenness centrality over CSR arrays, split across a process pool.
+
+Brandes' algorithm runs one shortest-path search per source and adds that
+source's dependencies to a running total, so sources are independent. The
+sources are dealt out in chunks to worker processes. The CSR arrays are
+placed in shared memory once and every worker maps them read-only instead
+of receiving its own copy of the graph. Each worker returns one
+partial-sum vector, and the parent adds them up.
+
+Results match networkx.betweenness_centrality (directed graphs, `weight`
+for the weighted variant), so the two are interchangeable.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappop, heappush
+from itertools import count
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Below this many nodes a pool costs more than it saves
+PARALLEL_MIN_NODES = 1000
+CHUNKS_PER_WORKER = 4
+
+_worker_graph = None  # (indptr, indices, weights) views inside a worker
+_worker_shm = []
+
+
+def betweenness(indptr, indices, weights=None, sources=None, processes=None, normalized=True):
+    """Betweenness of every node in a directed CSR graph.
+
+    weights: per-edge lengths, or None for hop counts.
+    sources: node ids to run searches from (default all); a subset gives the
+        raw partial sums, which is what sampling estimators need.
+    processes: worker count; None uses every core once the graph is large
+        enough, 1 runs in this process.
+    """
+    n = len(indptr) - 1
+    totals = _run(indptr, indices, weights, sources, processes, moments=False)
+    if normalized and n > 2:
+        totals *= 1.0 / ((n - 1) * (n - 2))
+    return totals
+
+
+def betweenness_moments(indptr, indices, weights=None, sources=None, processes=None):
+    """Per-node sum and sum of squares of the per-source dependencies (unnormalized).
+
+    Used by sampling estimators to put error bars on a partial result.
+    """
+    moments = _run(indptr, indices, weights, sources, processes, moments=True)
+    return moments[0], moments[1]
+
+
+def network_betweenness(network, weighted=True, processes=None, normalized=True):
+    """Betweenness for a network.core.Network, in station-id order"""
+    weights = network.weights if weighted else None
+    return betweenness(network.indptr, network.indices, weights, processes=processes, normalized=normalized)
+
+
+def _run(indptr, indices, weights, sources, processes, moments):
+    n = len(indptr) - 1
+    sources = np.arange(n) if sources is None else np.asarray(sources)
+    if processes is None:
+        processes = os.cpu_count() if n >= PARALLEL_MIN_NODES else 1
+    processes = max(1, min(processes, len(sources)))
+    if processes == 1:
+        return _accumulate(sources.tolist(), indptr, indices, weights, moments)
+    return _parallel_accumulate(sources, indptr, indices, weights, processes, moments)
+
+
+def _parallel_accumulate(sources, indptr, indices, weights, processes, moments=False):
+    arrays = [indptr, indices] + ([] if weights is None else [weights])
+    blocks, specs = [], []
+    try:
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+            blocks.append(shm)
+            specs.append((shm.name, array.shape, array.dtype.str))
+
+        chunks = [chunk.tolist() for chunk in np.array_split(sources, processes * CHUNKS_PER_WORKER) if len(chunk)]
+        with ProcessPoolExecutor(processes, initializer=_attach, initargs=(specs,)) as pool:
+            partials = pool.map(_accumulate_chunk, chunks, [moments] * len(chunks))
+            return np.sum(list(partials), axis=0)
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def _attach(specs):
+    global _worker_graph
+    views = []
+    for name, shape, dtype in specs:
+        shm = shared_memory.SharedMemory(name=name)
+        _worker_shm.append(shm)  # keep the mapping alive for the worker's lifetime
+        views.append(np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf))
+    indptr, indices = views[0], views[1]
+    weights = views[2] if len(views) > 2 else None
+    _worker_graph = (indptr, indices, weights)
+
+
+def _accumulate_chunk(sources, moments):
+    indptr, indices, weights = _worker_graph
+    return _accumulate(sources, indptr, indices, weights, moments)
+
+
+def _accumulate(sources, indptr, indices, weights, moments=False):
+    """Sum of Brandes dependencies over the given sources (and of their squares if moments)"""
+    n = len(indptr) - 1
+    totals = np.zeros((2, n)) if moments else np.zeros(n)
+    search = _search_weighted if weights is not None else _search_unweighted
+    for s in sources:
+        order, preds, sigma = search(s, indptr, indices, weights)
+        delta = dict.fromkeys(order, 0.0)
+        while order:
+            w = order.pop()
+            coeff = (1.0 + delta[w]) / sigma[w]
+            for v in preds[w]:
+                delta[v] += sigma[v] * coeff
+            if w != s:
+                if moments:
+                    totals[0, w] += delta[w]
+                    totals[1, w] += delta[w] * delta[w]
+                else:
+                    totals[w] += delta[w]
+    return totals
+
+
+def _search_unweighted(s, indptr, indices, _weights):
+    order, preds, sigma, dist = [], {s: []}, {s: 1.0}, {s: 0}
+    queue = [s]
+    for v in queue:
+        order.append(v)
+        next_dist = dist[v] + 1
+        for w in indices[indptr[v]:indptr[v + 1]].tolist():
+            if w not in dist:
+                dist[w] = next_dist
+                sigma[w] = 0.0
+                preds[w] = []
+                queue.append(w)
+            if dist[w] == next_dist:
+                sigma[w] += sigma[v]
+                preds[w].append(v)
+    return order, preds, sigma
+
+
+def _search_weighted(s, indptr, indices, weights):
+    order, preds, sigma, done, seen = [], {s: []}, {s: 1.0}, set(), {s: 0.0}
+    tie = count()
+    heap = [(0.0, next(tie), s, s)]
+    while heap:
+        dist, _, pred, v = heappop(heap)
+        if v in done:
+            continue
+        if pred != v:
+            sigma[v] += sigma[pred]
+        order.append(v)
+        done.add(v)
+        start, end = indptr[v], indptr[v + 1]
+        for w, length in zip(indices[start:end].tolist(), weights[start:end].tolist()):
+            candidate = dist + length
+            if w not in done and (w not in seen or candidate < seen[w]):
+                seen[w] = candidate
+                heappush(heap, (candidate, next(tie), v, w))
+                sigma[w] = 0.0
+                preds[w] = [v]
+            elif candidate == seen.get(w):
+                sigma[w] += sigma[v]
+                preds[w].append(v)
+    return order, preds, sigma
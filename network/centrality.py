@@ -0,0 +1,85 @@
+"""Station centrality metrics, computed once per connections data version.
+
+Degree, betweenness and closeness are computed both unweighted (hops) and
+weighted by travel minutes, then written to a Parquet file named after the
+data version. Later runs, and every Streamlit rerun, just read that file.
+
+Rebuild the artifact ahead of time with `python3 -m network.centrality`.
+"""
+import os
+import time
+
+import networkx as nx
+import pandas as pd
+
+from network.betweenness import network_betweenness
+from network.core import ARTIFACT_DIR, CONNECTIONS_CSV, connections_version, load_network
+
+COLUMNS = [
+    "Station",
+    "Degree_Centrality",
+    "Betweenness_Centrality",
+    "Closeness_Centrality",
+    "Weighted_Betweenness_Centrality",
+    "Weighted_Closeness_Centrality",
+    "Total_Connections",
+]
+
+
+def artifact_path(version, artifact_dir=ARTIFACT_DIR):
+    return os.path.join(artifact_dir, f"centrality-{version[:16]}.parquet")
+
+
+def compute_centrality(network, processes=None):
+    """One row per station with unweighted and minute-weighted centralities.
+
+    Betweenness runs on the network's CSR arrays, across `processes` workers
+    for large graphs (see network.betweenness).
+    """
+    G = network.graph
+    nodes = list(network.stations)
+    degree = nx.degree_centrality(G)
+    closeness = nx.closeness_centrality(G)
+    weighted_closeness = nx.closeness_centrality(G, distance="weight")
+    return pd.DataFrame({
+        "Station": nodes,
+        "Degree_Centrality": [degree[n] for n in nodes],
+        "Betweenness_Centrality": network_betweenness(network, weighted=False, processes=processes),
+        "Closeness_Centrality": [closeness[n] for n in nodes],
+        "Weighted_Betweenness_Centrality": network_betweenness(network, weighted=True, processes=processes),
+        "Weighted_Closeness_Centrality": [weighted_closeness[n] for n in nodes],
+        "Total_Connections": [G.degree(n) for n in nodes],
+    }, columns=COLUMNS)
+
+
+def save_centrality(df, path):
+    # Write then rename so a concurrent reader never sees a partial file; the pid keeps
+    # two writers (the API and a bundle build) from sharing a temp file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def load_centrality(version=None, connections_path=CONNECTIONS_CSV, artifact_dir=ARTIFACT_DIR):
+    """Centrality table for the current (or given) data version, computing it on a miss"""
+    version = version or connections_version(connections_path)
+    path = artifact_path(version, artifact_dir)
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+
+    df = compute_centrality(load_network(connections_path))
+    try:
+        save_centrality(df, path)
+    except OSError as e:
+        print(f"Could not save centrality artifact: {e}")
+    return df
+
+
+if __name__ == "__main__":
+    network = load_network()
+    started = time.perf_counter()
+    df = compute_centrality(network)
+    save_centrality(df, artifact_path(network.version))
+    print(f"Computed centrality for {len(df)} stations in {time.perf_counter() - started:.2f}s "
+          f"-> {artifact_path(network.version)}")
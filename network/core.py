@@ -0,0 +1,144 @@
+"""Shared in-memory model of the subway network built from connections.csv.
+
+The edge table is read once per process and data version, and exposed as
+
+    edges     every row of connections.csv plus integer src/dst station ids
+    stations  station names, indexed by station id
+    indptr / indices / weights
+              CSR adjacency over distinct (src, dst) links, fastest time kept
+    graph     the same links as a NetworkX DiGraph (built on first use)
+    two_way   the same network with a reverse link for every connection,
+              as riders use it (connections.csv lists each segment one way)
+
+Pages and the API call load_network() instead of reading the CSV themselves.
+"""
+import hashlib
+import os
+import threading
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.getenv("MBTA_DATA_DIR", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CONNECTIONS_CSV = os.path.join(DATA_DIR, "connections.csv")
+ARTIFACT_DIR = os.path.join(DATA_DIR, "DATA")
+
+CONNECTION_DTYPES = {"From": str, "To": str, "Color": str, "Minutes": np.float64}
+
+
+_file_hashes = {}  # absolute path -> ((size, mtime_ns), sha1)
+
+
+def file_sha1(path):
+    """Content hash of a file, re-read only when its size or mtime has changed since the last call"""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    stamp = (stat.st_size, stat.st_mtime_ns)
+    entry = _file_hashes.get(path)
+    if entry is None or entry[0] != stamp:
+        with open(path, "rb") as f:
+            entry = _file_hashes[path] = (stamp, hashlib.sha1(f.read()).hexdigest())
+    return entry[1]
+
+
+def connections_version(path=CONNECTIONS_CSV):
+    """Content hash of the connections file; every cached result is keyed by it"""
+    return file_sha1(path)
+
+
+def read_connections(path=CONNECTIONS_CSV):
+    df = pd.read_csv(path, dtype=CONNECTION_DTYPES)
+    for column in ("From", "To", "Color"):
+        df[column] = df[column].str.strip()
+    df["Color"] = df["Color"].str.lower()
+    return df
+
+
+class Network:
+    def __init__(self, connections_df, version):
+        self.version = version
+        # Station ids follow first appearance in the file, as a DiGraph built row by row would
+        self.stations = pd.Index(pd.unique(connections_df[["From", "To"]].to_numpy().ravel()), name="Station")
+        self.edges = connections_df.assign(
+            src=self.stations.get_indexer(connections_df["From"]).astype(np.int32),
+            dst=self.stations.get_indexer(connections_df["To"]).astype(np.int32),
+        )
+
+        # One link per (src, dst): the fastest row, sorted so it can be read as CSR
+        self.links = (self.edges.sort_values("Minutes", kind="stable")
+                      .drop_duplicates(["src", "dst"])
+                      .sort_values(["src", "dst"])
+                      .reset_index(drop=True))
+        n = len(self.stations)
+        self.indptr = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(np.bincount(self.links["src"], minlength=n), out=self.indptr[1:])
+        self.indices = self.links["dst"].to_numpy(dtype=np.int32)
+        self.weights = self.links["Minutes"].to_numpy(dtype=np.float32)
+
+    @property
+    def n_stations(self):
+        return len(self.stations)
+
+    def station_id(self, name):
+        """Integer id for a station name, or None"""
+        position = self.stations.get_indexer([name])[0]
+        return None if position < 0 else int(position)
+
+    def csr_matrix(self):
+        """SciPy sparse adjacency in minutes (a new wrapper around the shared arrays)"""
+        from scipy.sparse import csr_matrix
+        n = self.n_stations
+        return csr_matrix((self.weights, self.indices, self.indptr), shape=(n, n))
+
+    @cached_property
+    def two_way(self):
+        """Network with a reverse link (same colour and minutes) added for every connection; same station ids"""
+        rows = self.edges[["From", "To", "Color", "Minutes"]]
+        reverse = rows.rename(columns={"From": "To", "To": "From"})[rows.columns]
+        return Network(pd.concat([rows, reverse], ignore_index=True), self.version)
+
+    def without(self, stations=(), segments=()):
+        """Network with every connection of the given stations and the given (from, to) segments removed.
+
+        Segments are dropped in both directions. Stations left with no
+        connection drop out, so ids are renumbered; the version is derived
+        from this one and the closures, so cached results never mix them up.
+        """
+        closed = set(stations)
+        pairs = {tuple(pair) for pair in segments}
+        pairs |= {(to, start) for start, to in pairs}
+        rows = self.edges[["From", "To", "Color", "Minutes"]]
+        dropped = rows["From"].isin(closed) | rows["To"].isin(closed)
+        if pairs:
+            dropped |= pd.MultiIndex.from_frame(rows[["From", "To"]]).isin(list(pairs))
+        closures = repr((sorted(closed), sorted(pairs))).encode()
+        version = hashlib.sha1(self.version.encode() + closures).hexdigest()
+        return Network(rows[~dropped].reset_index(drop=True), version)
+
+    @cached_property
+    def graph(self):
+        """NetworkX DiGraph with `weight` (minutes) and `color` on each link; treat as read-only"""
+        import networkx as nx
+        G = nx.DiGraph()
+        G.add_nodes_from(self.stations)
+        G.add_edges_from(
+            (u, v, {"weight": w, "color": c})
+            for u, v, w, c in self.links[["From", "To", "Minutes", "Color"]].itertuples(index=False, name=None)
+        )
+        return G
+
+
+_networks = {}  # path -> Network for the latest version seen
+_lock = threading.Lock()
+
+
+def load_network(path=CONNECTIONS_CSV):
+    """The process-wide Network for path, rebuilt only when the file's content changes"""
+    path = os.path.abspath(path)
+    version = connections_version(path)
+    with _lock:
+        network = _networks.get(path)
+        if network is None or network.version != version:
+            network = _networks[path] = Network(read_connections(path), version)
+        return network
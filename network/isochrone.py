@@ -0,0 +1,155 @@
+"""Travel-time-bounded reachability ("everything within 20 minutes of Alewife").
+
+Each origin gets a Dijkstra search that is only run as far as the largest
+budget asked for so far. The search keeps its heap, so a bigger budget
+resumes where it stopped and a smaller one just filters what is already
+settled. Searches are kept in an LRU keyed by (origin, transfer penalty).
+They run over network.two_way, so every segment can be ridden both ways,
+as in the route planner.
+
+With a transfer penalty, the search runs over (station, line colour) states
+and changing colour at a station costs the penalty. Without one it runs
+over stations only. The penalty is a flat number of minutes, a named
+per-station profile (e.g. platform-to-platform walking times from
+gtfs.transfers), or both added together.
+"""
+import threading
+from collections import OrderedDict
+from heapq import heappop, heappush
+
+import numpy as np
+import pandas as pd
+
+from network.names import normalize_station_name
+
+MAX_TREES = 256
+
+
+class ShortestPathTree:
+    """Dijkstra from one origin, settled out to `radius` minutes and extendable.
+
+    transfer_penalty: minutes per line change, flat or one value per station id
+    """
+
+    def __init__(self, network, colors, origin, transfer_penalty=0.0):
+        self.origin = origin
+        self.transfer_penalty = transfer_penalty
+        self._per_station = isinstance(transfer_penalty, np.ndarray)
+        self._penalties = transfer_penalty.tolist() if self._per_station else transfer_penalty
+        self._indptr = network.indptr
+        self._indices = network.indices
+        self._weights = network.weights
+        self._colors = colors
+        self.minutes = {}   # station id -> minutes, in settle order
+        self.via = {}       # station id -> previous station id on the best path
+        self._done = set()  # settled states
+        self._heap = [(0.0, origin, -1, -1)]  # (minutes, station, colour arrived on, previous station)
+        self.radius = -1.0
+
+    def extend(self, budget):
+        """Settle every station reachable within budget minutes"""
+        if budget <= self.radius:
+            return
+        heap, penalties, per_station = self._heap, self._penalties, self._per_station
+        penalty = any(penalties) if per_station else penalties
+        while heap and heap[0][0] <= budget:
+            minutes, v, color, prev = heappop(heap)
+            state = (v, color if penalty else -1)
+            if state in self._done:
+                continue
+            self._done.add(state)
+            if v not in self.minutes:
+                self.minutes[v] = minutes
+                self.via[v] = prev
+            start, end = self._indptr[v], self._indptr[v + 1]
+            for w, length, line in zip(self._indices[start:end].tolist(), self._weights[start:end].tolist(),
+                                       self._colors[start:end].tolist()):
+                cost = minutes + length
+                if penalty and color >= 0 and line != color:
+                    cost += penalties[v] if per_station else penalties
+                if (w, line if penalty else -1) not in self._done:
+                    heappush(heap, (cost, w, line, v))
+        self.radius = budget if heap else float("inf")
+
+    def within(self, budget):
+        """[(station id, minutes, previous station id)] reachable within budget, nearest first"""
+        self.extend(budget)
+        return [(v, m, self.via[v]) for v, m in self.minutes.items() if m <= budget]
+
+
+class IsochroneIndex:
+    def __init__(self, network, max_trees=MAX_TREES, name_key=normalize_station_name):
+        self.network = network
+        self.stations = network.stations
+        self._graph = network.two_way
+        self.max_trees = max_trees
+        self.name_key = name_key
+        self._ids = {name_key(name): i for i, name in enumerate(self.stations)}
+        # Colour code of each CSR link, aligned with network.indices
+        self._colors = pd.factorize(self._graph.links["Color"])[0].astype(np.int32)
+        self._profiles = {}
+        self._trees = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def station_id(self, name):
+        return self._ids.get(self.name_key(name))
+
+    def add_transfer_profile(self, name, minutes_by_station):
+        """Register per-station transfer minutes (a Series keyed by station name; missing stations cost 0)"""
+        minutes = np.zeros(len(self.stations))
+        for station, value in minutes_by_station.items():
+            i = self.station_id(station)
+            if i is not None and np.isfinite(value):
+                minutes[i] = value
+        with self._lock:
+            self._profiles[name] = minutes
+            # Searches made with an older version of this profile are stale
+            for key in [key for key in self._trees if key[2] == name]:
+                del self._trees[key]
+
+    @property
+    def transfer_profiles(self):
+        return sorted(self._profiles)
+
+    def tree(self, origin, transfer_penalty=0.0, profile=None):
+        """Cached search for (origin id, penalty, profile), most recently used last"""
+        key = (origin, float(transfer_penalty), profile)
+        tree = self._trees.get(key)
+        if tree is not None:
+            self.hits += 1
+            self._trees.move_to_end(key)
+            return tree
+        self.misses += 1
+        penalty = float(transfer_penalty)
+        if profile is not None:
+            penalty = self._profiles[profile] + penalty
+        tree = self._trees[key] = ShortestPathTree(self._graph, self._colors, origin, penalty)
+        if len(self._trees) > self.max_trees:
+            self._trees.popitem(last=False)
+        return tree
+
+    def reachable(self, origin_name, budget, transfer_penalty=0.0, profile=None):
+        """Stations reachable from origin_name within budget minutes, as a DataFrame.
+
+        Raises KeyError for an unknown station or transfer profile.
+        """
+        origin = self.station_id(origin_name)
+        if origin is None:
+            raise KeyError(f"Station '{origin_name}' not found")
+        if profile is not None and profile not in self._profiles:
+            raise KeyError(f"Unknown transfer profile '{profile}'")
+        with self._lock:
+            settled = self.tree(origin, transfer_penalty, profile).within(budget)
+        ids = np.fromiter((v for v, _, _ in settled), dtype=np.int64, count=len(settled))
+        via = np.fromiter((p for _, _, p in settled), dtype=np.int64, count=len(settled))
+        return pd.DataFrame({
+            "Station": self.stations[ids],
+            "Minutes": [m for _, m, _ in settled],
+            "Via": np.where(via >= 0, self.stations[np.maximum(via, 0)], None),
+        })
+
+    def stats(self):
+        return {"trees": len(self._trees), "max_trees": self.max_trees, "hits": self.hits, "misses": self.misses,
+                "transfer_profiles": self.transfer_profiles}
@@ -0,0 +1,38 @@
+"""Station-name keys shared by the API, the network pages and the GTFS matcher.
+
+The same station is spelled differently across sources: the database stops
+table, connections.csv ("Porter Square", "St. Paul Street (1)") and the GTFS
+feed ("Porter", "Saint Paul Street", "Science Park/West End").
+normalize_station_name folds case, whitespace, "(n)" suffixes, "St." /
+"Saint" and dots / apostrophes, then maps STATION_ALIASES onto one spelling.
+"""
+import re
+
+# Older or longer spellings -> the current GTFS / stops-table name, as cleaned
+STATION_ALIASES = {
+    "harvard square": "harvard",
+    "porter square": "porter",
+    "central square": "central",
+    "new england medical center": "tufts medical center",
+    "newton center": "newton centre",
+    "fenwood street": "fenwood road",
+    "fairbanks": "fairbanks street",
+    "griggs street/long avenue": "griggs street",
+    "sutherland street": "sutherland road",
+    "mass avenue": "massachusetts avenue",
+    "science park": "science park/west end",
+}
+
+
+def clean_station_name(name):
+    """Lowercase, collapse whitespace, drop '(1)' suffixes and punctuation, spell out 'St.'"""
+    name = re.sub(r"\s+", " ", str(name).lower().strip())
+    name = re.sub(r"\s*\(\d+\)$", "", name)     # "St. Paul Street (1)"
+    name = re.sub(r"^st\.?\s", "saint ", name)   # "St. Marys Street"
+    return re.sub(r"[.']", "", name)            # "St. Mary's" / "Saint Marys"
+
+
+def normalize_station_name(name):
+    """Case/punctuation-insensitive key shared by every spelling of a station"""
+    name = clean_station_name(name)
+    return STATION_ALIASES.get(name, name)
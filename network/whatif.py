@@ -0,0 +1,185 @@
+"""Station / segment closure impact ("what if X is closed?").
+
+Starts from the all-pairs travel-time matrix of the open network and
+recomputes only the source rows a change can affect:
+
+    removed or slowed link u->v   sources whose shortest-path tree uses it,
+                                  i.e. D[s, u] + w(u, v) == D[s, v]
+    faster link u->v              sources that could now improve,
+                                  i.e. D[s, u] + w'(u, v) < D[s, v]
+    closed station x              all of x's links are removed
+
+Those rows are rerun with one multi-source Dijkstra on the modified graph;
+every other row is reused as is. The graph is network.two_way, so segments
+can be ridden in both directions, as in the route planner.
+"""
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from network.names import normalize_station_name
+
+# Matrices are float32, so "on a shortest path" is tested with a tolerance
+TIGHT_TOLERANCE = 1e-3
+
+
+def rounded(minutes, digits=3):
+    """Rounded float, with -0.0 (tiny negative noise) reported as 0.0"""
+    return round(float(minutes), digits) + 0.0
+
+
+class WhatIfEngine:
+    def __init__(self, network, base=None, name_key=normalize_station_name):
+        """
+        network: network.core.Network
+        base: all-pairs minutes for the open two-way network in station-id
+            order; computed if omitted
+        name_key: normalizes station names for lookup
+        """
+        self.network = network
+        self.stations = network.stations
+        graph = network.two_way
+        if base is None:
+            base = dijkstra(graph.csr_matrix(), directed=True)
+        self.base = np.asarray(base, dtype=np.float32)
+        self.name_key = name_key
+        self._ids = {name_key(name): i for i, name in enumerate(self.stations)}
+        links = graph.links
+        self._src = links["src"].to_numpy(np.int64)
+        self._dst = links["dst"].to_numpy(np.int64)
+        self._weights = links["Minutes"].to_numpy(np.float64)
+        self._link_ids = {(u, v): i for i, (u, v) in enumerate(zip(self._src.tolist(), self._dst.tolist()))}
+
+    def station_id(self, name):
+        return self._ids.get(self.name_key(name))
+
+    def apply(self, closed_stations=(), closed_segments=(), reweighted_segments=(), both_directions=True):
+        """Travel times with the given changes.
+
+        closed_stations: station names
+        closed_segments: (from, to) name pairs
+        reweighted_segments: (from, to, minutes) triples
+        both_directions: apply segment changes to the reverse link as well
+        Raises KeyError for unknown stations or segments.
+        """
+        closed = np.zeros(len(self.stations), dtype=bool)
+        for name in closed_stations:
+            closed[self._require_station(name)] = True
+
+        weights = self._weights.copy()
+        for from_name, to_name in closed_segments:
+            for link in self._segment_links(from_name, to_name, both_directions):
+                weights[link] = np.inf
+        for from_name, to_name, minutes in reweighted_segments:
+            for link in self._segment_links(from_name, to_name, both_directions):
+                weights[link] = float(minutes)
+        weights[closed[self._src] | closed[self._dst]] = np.inf
+
+        affected = self._affected_sources(weights)
+        affected &= ~closed
+        updated = self.base.copy()
+        if affected.any():
+            keep = np.isfinite(weights)
+            n = len(self.stations)
+            graph = csr_matrix((weights[keep], (self._src[keep], self._dst[keep])), shape=(n, n))
+            updated[affected] = dijkstra(graph, directed=True, indices=np.flatnonzero(affected))
+        updated[closed, :] = np.inf
+        updated[:, closed] = np.inf
+        return WhatIfResult(self.stations, self.base, updated, closed, affected)
+
+    def _affected_sources(self, weights):
+        changed = np.flatnonzero(weights != self._weights)
+        affected = np.zeros(len(self.stations), dtype=bool)
+        for link in changed:
+            u, v, old, new = self._src[link], self._dst[link], self._weights[link], weights[link]
+            via_u = self.base[:, u].astype(np.float64)
+            with np.errstate(invalid="ignore"):
+                if new > old:
+                    affected |= np.isfinite(via_u) & (np.abs(via_u + old - self.base[:, v]) <= TIGHT_TOLERANCE)
+                else:
+                    affected |= via_u + new < self.base[:, v] - TIGHT_TOLERANCE
+        return affected
+
+    def _require_station(self, name):
+        station = self.station_id(name)
+        if station is None:
+            raise KeyError(f"Station '{name}' not found")
+        return station
+
+    def _segment_links(self, from_name, to_name, both_directions):
+        u, v = self._require_station(from_name), self._require_station(to_name)
+        pairs = [(u, v), (v, u)] if both_directions else [(u, v)]
+        links = [self._link_ids[pair] for pair in pairs if pair in self._link_ids]
+        if not links:
+            raise KeyError(f"No segment between '{from_name}' and '{to_name}'")
+        return links
+
+
+class WhatIfResult:
+    def __init__(self, stations, base, updated, closed, affected):
+        self.stations = stations
+        self.base = base
+        self.updated = updated
+        self.closed = closed
+        self.affected = affected
+        # Pairs that still make sense to compare: both ends open and reachable before
+        self._comparable = np.isfinite(base) & ~closed[:, None] & ~closed[None, :]
+        np.fill_diagonal(self._comparable, False)
+
+    @property
+    def recomputed_sources(self):
+        return int(self.affected.sum())
+
+    def delta(self):
+        """Change in minutes per pair; NaN where not comparable, inf where newly disconnected"""
+        with np.errstate(invalid="ignore"):
+            return np.where(self._comparable, self.updated - self.base, np.nan)
+
+    def disconnected_pairs(self):
+        """Pairs reachable before and unreachable after, with their old travel time"""
+        rows, cols = np.nonzero(self._comparable & ~np.isfinite(self.updated))
+        return pd.DataFrame({
+            "From": self.stations[rows],
+            "To": self.stations[cols],
+            "Old_Minutes": self.base[rows, cols].astype(float),
+        })
+
+    def changed_pairs(self, limit=None):
+        """Pairs still connected whose travel time changed, largest increase first"""
+        delta = self.delta()
+        rows, cols = np.nonzero(np.isfinite(delta) & (np.abs(delta) > TIGHT_TOLERANCE))
+        changes = pd.DataFrame({
+            "From": self.stations[rows],
+            "To": self.stations[cols],
+            "Old_Minutes": self.base[rows, cols].astype(float),
+            "New_Minutes": self.updated[rows, cols].astype(float),
+            "Delta_Minutes": delta[rows, cols].astype(float),
+        }).sort_values("Delta_Minutes", ascending=False, kind="stable")
+        return changes if limit is None else changes.head(limit)
+
+    def station_impact(self):
+        """Per origin: mean delay over still-connected destinations and count of lost destinations"""
+        delta = self.delta()
+        finite = np.isfinite(delta)
+        connected = finite.sum(axis=1)
+        mean_delay = np.where(finite, delta, 0.0).sum(axis=1) / np.maximum(connected, 1)
+        lost = (self._comparable & ~np.isfinite(self.updated)).sum(axis=1)
+        return (pd.DataFrame({"Station": self.stations, "Mean_Delay_Minutes": mean_delay,
+                              "Lost_Destinations": lost})[~self.closed]
+                .sort_values(["Lost_Destinations", "Mean_Delay_Minutes"], ascending=False)
+                .reset_index(drop=True))
+
+    def summary(self):
+        delta = self.delta()
+        finite = delta[np.isfinite(delta)]
+        return {
+            "closed_stations": list(self.stations[self.closed]),
+            "recomputed_sources": self.recomputed_sources,
+            "total_sources": len(self.stations),
+            "pairs_compared": int(self._comparable.sum()),
+            "pairs_changed": int((np.abs(finite) > TIGHT_TOLERANCE).sum()),
+            "pairs_disconnected": int((self._comparable & ~np.isfinite(self.updated)).sum()),
+            "mean_delta_minutes": rounded(finite.mean()) if finite.size else 0.0,
+            "max_delta_minutes": rounded(finite.max()) if finite.size else 0.0,
+        }
@@ -8,6 +8,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 import threading
 
+from network.core import load_network
+
 st.set_page_config(page_title="AI Assistant", layout="wide")
 
 # Custom CSS for better styling
@@ -165,7 +167,7 @@ with st.sidebar:
 # Load data
 @st.cache_data
 def load_data():
-    connections_df = pd.read_csv("connections.csv")
+    connections_df = load_network().edges[["From", "To", "Color", "Minutes"]]
     stations_df = pd.read_csv("stations.csv")
     locations_df = pd.read_csv("locations.csv")
     return connections_df, stations_df, locations_df
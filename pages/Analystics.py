@@ -1,10 +1,16 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import networkx as nx
 from plotly.subplots import make_subplots
-import numpy as np
+
+from network.analytics import inputs_version, load_bundle
+from network.approximate import estimate_centrality, samples_for_error
+from network.core import load_network
+from network.whatif import WhatIfEngine
+from gtfs.calendar import load_calendar
+from gtfs.feed import load_feed
 
 st.set_page_config(page_title="Boston Subway Analytics", layout="wide")
 
@@ -108,16 +114,17 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Load Data
-@st.cache_data
-def load_data():
-    stations_df = pd.read_csv("stations.csv")
-    locations_df = pd.read_csv("locations.csv")
-    connections_df = pd.read_csv("connections.csv")
-    connections_df["Color"] = connections_df["Color"].str.lower()
-    return stations_df, locations_df, connections_df
+# Shared per-process network; rebuilt only when connections.csv changes
+network = load_network()
+data_version = network.version
+connections_df = network.edges
+
+# Heavy analytics are precomputed by `python3 -m network.analytics`; this only maps the files
+@st.cache_resource
+def get_bundle(bundle_version):
+    return load_bundle()
 
-stations_df, locations_df, connections_df = load_data()
+bundle = get_bundle(inputs_version())
 
 # Color mapping
 color_map = {
@@ -128,16 +135,10 @@ color_map = {
 # Network Analysis
 st.header("Network Structure Analysis")
 
-# Create network graph
-G = nx.DiGraph()
-for _, row in connections_df.iterrows():
-    G.add_edge(row["From"], row["To"], weight=row["Minutes"], color=row["Color"])
-
 # Calculate network metrics
-total_stations = len(G.nodes())
-total_connections = len(G.edges())
-avg_degree = sum(dict(G.degree()).values()) / len(G.nodes())
-density = nx.density(G)
+total_stations = bundle.summary["total_stations"]
+total_connections = bundle.summary["total_connections"]
+avg_degree = bundle.summary["avg_degree"]
 
 # Network overview metrics
 col1, col2, col3 = st.columns(3)
@@ -152,15 +153,7 @@ with col3:
 st.subheader("Line Performance Analysis")
 
 # Line statistics
-line_stats = connections_df.groupby("Color").agg({
-    "Minutes": ["count", "mean", "min", "max", "sum"],
-    "From": "nunique",
-    "To": "nunique"
-}).round(2)
-
-line_stats.columns = ["Connections", "Avg_Time", "Min_Time", "Max_Time", "Total_Time", "Unique_From", "Unique_To"]
-line_stats["Stations"] = line_stats[["Unique_From", "Unique_To"]].max(axis=1)
-line_stats["Efficiency"] = line_stats["Total_Time"] / line_stats["Connections"]
+line_stats = bundle.table("line_stats").set_index("Color")
 
 # Line comparison chart
 fig_line_comparison = make_subplots(
@@ -204,19 +197,8 @@ st.plotly_chart(fig_line_comparison, use_container_width=True)
 # Station Connectivity Analysis
 st.subheader("Station Connectivity Analysis")
 
-# Calculate degree centrality for each station
-degree_centrality = nx.degree_centrality(G)
-betweenness_centrality = nx.betweenness_centrality(G)
-closeness_centrality = nx.closeness_centrality(G)
-
-# Create centrality dataframe
-centrality_df = pd.DataFrame({
-    "Station": list(G.nodes()),
-    "Degree_Centrality": [degree_centrality[node] for node in G.nodes()],
-    "Betweenness_Centrality": [betweenness_centrality[node] for node in G.nodes()],
-    "Closeness_Centrality": [closeness_centrality[node] for node in G.nodes()],
-    "Total_Connections": [G.degree(node) for node in G.nodes()]
-})
+# Centrality metrics are precomputed once per data version and shared across sessions
+centrality_df = bundle.table("centrality")
 
 # Top 10 most connected stations
 top_stations = centrality_df.nlargest(10, "Total_Connections")
@@ -230,7 +212,69 @@ fig_top_stations = px.bar(
     color_continuous_scale="viridis"
 )
 fig_top_stations.update_layout(xaxis_tickangle=-45)
-st.plotly_chart(fig_top_stations, use_container_width=True)
+
+# Betweenness / closeness, exact from the cached artifact or estimated from sampled pivots
+@st.cache_data
+def get_centrality_estimate(data_version, metric_weighted, samples, epsilon, prefer_exact, _network):
+    return estimate_centrality(_network, samples=samples, epsilon=epsilon, weighted=metric_weighted,
+                               use_cache=prefer_exact)
+
+with st.expander("Centrality estimation settings"):
+    est_col1, est_col2, est_col3 = st.columns(3)
+    with est_col1:
+        centrality_mode = st.radio("Mode", ["Exact", "Approximate"], horizontal=True)
+        metric_weighted = st.checkbox("Weight by travel minutes", value=True)
+    with est_col2:
+        sizing = st.radio("Approximation by", ["Sample size", "Target error"], horizontal=True,
+                          disabled=centrality_mode == "Exact")
+        if sizing == "Sample size":
+            samples = st.slider("Pivot stations", 2, network.n_stations, min(50, network.n_stations),
+                                disabled=centrality_mode == "Exact")
+            epsilon = None
+        else:
+            # Hoeffding's bound is loose: below ~0.2 it asks for every station of this network
+            epsilon = st.slider("Target error (normalized betweenness)", 0.05, 0.5, 0.25, 0.05,
+                                disabled=centrality_mode == "Exact")
+            samples = None
+            st.caption(f"Needs {samples_for_error(network.n_stations, epsilon)} of {network.n_stations} "
+                       "stations as pivots")
+    with est_col3:
+        centrality_metric = st.radio("Metric", ["Betweenness", "Closeness"], horizontal=True)
+        prefer_exact = st.checkbox("Use exact values when the cache is current", value=True,
+                                   disabled=centrality_mode == "Exact")
+
+if centrality_mode == "Exact":
+    samples, epsilon, prefer_exact = network.n_stations, None, True
+estimate_df = get_centrality_estimate(data_version, metric_weighted, samples, epsilon, prefer_exact, network)
+top_central = estimate_df.nlargest(10, centrality_metric)
+
+fig_top_central = go.Figure(go.Bar(
+    x=top_central["Station"],
+    y=top_central[centrality_metric],
+    error_y=dict(
+        type="data",
+        symmetric=False,
+        array=top_central[f"{centrality_metric}_High"] - top_central[centrality_metric],
+        arrayminus=top_central[centrality_metric] - top_central[f"{centrality_metric}_Low"],
+    ),
+    marker_color="#667eea",
+))
+fig_top_central.update_layout(title=f"Top 10 Stations by {centrality_metric}", xaxis_tickangle=-45)
+
+chart_col1, chart_col2 = st.columns(2)
+with chart_col1:
+    st.plotly_chart(fig_top_stations, use_container_width=True)
+with chart_col2:
+    st.plotly_chart(fig_top_central, use_container_width=True)
+    if estimate_df["Exact"].iloc[0]:
+        st.caption("Exact values (cached for the current data version).")
+    else:
+        st.caption(f"Estimated from {estimate_df['Samples'].iloc[0]} pivot stations; "
+                   "error bars show 95% confidence intervals.")
+    st.dataframe(
+        top_central[["Station", centrality_metric, f"{centrality_metric}_Low", f"{centrality_metric}_High"]],
+        hide_index=True, use_container_width=True
+    )
 
 # --- Travel Time Analysis ---
 st.subheader("Travel Time Analysis")
@@ -259,27 +303,19 @@ st.plotly_chart(fig_time_by_line, use_container_width=True)
 # --- Network Efficiency Analysis ---
 st.subheader("Network Efficiency Analysis")
 
-# Calculate shortest paths
-def calculate_network_efficiency():
-    efficiency_data = []
-    for source in G.nodes():
-        for target in G.nodes():
-            if source != target:
-                try:
-                    shortest_path = nx.shortest_path_length(G, source, target, weight="Minutes")
-                    efficiency_data.append({
-                        "Source": source,
-                        "Target": target,
-                        "Shortest_Path_Time": shortest_path
-                    })
-                except nx.NetworkXNoPath:
-                    continue
-    return pd.DataFrame(efficiency_data)
-
-efficiency_df = calculate_network_efficiency()
-
-# Average travel time to reach any station
-avg_travel_times = efficiency_df.groupby("Source")["Shortest_Path_Time"].mean().sort_values()
+# Reductions of the precomputed all-pairs travel-time matrix
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Diameter", f"{bundle.summary['diameter_minutes']:.1f} min")
+with col2:
+    st.metric("Avg Shortest Path", f"{bundle.summary['avg_shortest_path_minutes']:.1f} min")
+with col3:
+    st.metric("Global Efficiency", f"{bundle.summary['global_efficiency']:.4f}")
+with col4:
+    st.metric("Reachable Pairs", f"{bundle.summary['reachable_pair_share']:.0%}")
+
+# Average travel time to reach any station (all-pairs shortest paths, precomputed)
+avg_travel_times = bundle.table("avg_travel_times").set_index("Station")["Average_Minutes"]
 fig_avg_travel = px.bar(
     x=avg_travel_times.index,
     y=avg_travel_times.values,
@@ -289,11 +325,149 @@ fig_avg_travel = px.bar(
 fig_avg_travel.update_layout(xaxis_tickangle=-45)
 st.plotly_chart(fig_avg_travel, use_container_width=True)
 
+# Travel-time heatmap, sliced straight out of the matrix
+efficiency_df = bundle.table("efficiency")
+col1, col2 = st.columns(2)
+with col1:
+    heatmap_lines = st.multiselect("Lines", sorted(connections_df["Color"].unique()),
+                                   format_func=lambda c: c.title(), key="heatmap_lines")
+with col2:
+    heatmap_order = st.radio("Order stations by", ["Network order", "Average travel time", "Eccentricity"],
+                             horizontal=True, key="heatmap_order")
+heatmap_stations = efficiency_df["Station"].astype(str)
+if heatmap_lines:
+    on_lines = connections_df[connections_df["Color"].isin(heatmap_lines)]
+    heatmap_stations = heatmap_stations[heatmap_stations.isin(pd.concat([on_lines["From"], on_lines["To"]]))]
+if heatmap_order != "Network order":
+    sort_column = "Average_Minutes" if heatmap_order == "Average travel time" else "Eccentricity_Minutes"
+    heatmap_stations = heatmap_stations[efficiency_df.loc[heatmap_stations.index, sort_column]
+                                        .sort_values(na_position="last").index]
+travel_block = bundle.travel_time_block(heatmap_stations)
+fig_heatmap = px.imshow(
+    travel_block.where(np.isfinite(travel_block)),
+    color_continuous_scale="Viridis",
+    labels={"x": "To", "y": "From", "color": "Minutes"},
+    title="Shortest Travel Time Between Stations (blank = unreachable)",
+    aspect="auto"
+)
+fig_heatmap.update_layout(height=800)
+st.plotly_chart(fig_heatmap, use_container_width=True)
+
+# --- Closure Impact (What-If) ---
+st.subheader("Closure Impact Analysis")
+
+# Starts from the precomputed two-way matrix; each scenario reruns only the affected source trees
+@st.cache_resource
+def get_whatif_engine(data_version, _network, _bundle):
+    base = _bundle.two_way_travel_times if _bundle.manifest["connections_version"] == data_version else None
+    return WhatIfEngine(_network, base)
+
+whatif_engine = get_whatif_engine(data_version, network, bundle)
+segment_options = [f"{u} → {v}" for u, v in network.links[["From", "To"]].itertuples(index=False, name=None)]
+
+whatif_col1, whatif_col2 = st.columns(2)
+with whatif_col1:
+    closed_stations = st.multiselect("Close stations", options=list(network.stations))
+with whatif_col2:
+    closed_segments = st.multiselect("Close segments (both directions)", options=segment_options)
+
+if closed_stations or closed_segments:
+    whatif_result = whatif_engine.apply(
+        closed_stations=closed_stations,
+        closed_segments=[tuple(segment.split(" → ")) for segment in closed_segments],
+    )
+    whatif_summary = whatif_result.summary()
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Source Trees Recomputed", f"{whatif_summary['recomputed_sources']} / {whatif_summary['total_sources']}")
+    m2.metric("Pairs Slower", whatif_summary["pairs_changed"])
+    m3.metric("Pairs Disconnected", whatif_summary["pairs_disconnected"])
+    m4.metric("Largest Delay", f"{whatif_summary['max_delta_minutes']:.1f} min")
+
+    impact_col1, impact_col2 = st.columns(2)
+    with impact_col1:
+        st.markdown("**Largest travel-time increases**")
+        st.dataframe(whatif_result.changed_pairs(20).round(2), hide_index=True, use_container_width=True)
+    with impact_col2:
+        st.markdown("**Newly disconnected pairs**")
+        st.dataframe(whatif_result.disconnected_pairs().round(2), hide_index=True, use_container_width=True)
+
+    station_impact = whatif_result.station_impact().head(15)
+    fig_impact = px.bar(
+        station_impact,
+        x="Station",
+        y="Mean_Delay_Minutes",
+        color="Lost_Destinations",
+        title="Most Affected Origins (mean delay to still-reachable stations)",
+        color_continuous_scale="reds"
+    )
+    fig_impact.update_layout(xaxis_tickangle=-45)
+    st.plotly_chart(fig_impact, use_container_width=True)
+
+    # Same estimation settings as above, on the network with the closures removed
+    closed_network = network.without(closed_stations, [tuple(segment.split(" → ")) for segment in closed_segments])
+    closed_estimate_df = get_centrality_estimate(closed_network.version, metric_weighted, samples, epsilon,
+                                                 prefer_exact, closed_network)
+    centrality_shift = (estimate_df[["Station", centrality_metric]]
+                        .merge(closed_estimate_df[["Station", centrality_metric]], on="Station",
+                               suffixes=("_Before", "_After"))
+                        .assign(Change=lambda df: df[f"{centrality_metric}_After"] - df[f"{centrality_metric}_Before"]))
+    centrality_shift = centrality_shift.reindex(centrality_shift["Change"].abs().sort_values(ascending=False).index)
+    st.markdown(f"**Largest {centrality_metric.lower()} changes after the closure**")
+    st.dataframe(centrality_shift.head(10).round(4), hide_index=True, use_container_width=True)
+    if not closed_estimate_df["Exact"].iloc[0]:
+        st.caption(f"After-closure values estimated from {closed_estimate_df['Samples'].iloc[0]} pivot stations.")
+else:
+    st.caption("Select stations or segments to see how travel times change when they are closed.")
+
+# --- Scheduled Service (GTFS calendar) ---
+st.subheader("Scheduled Service")
+
+# Services are compiled to day bitsets once; per-date answers are cached by the calendar
+service_calendar = load_calendar()
+gtfs_routes = load_feed().routes.astype({"route_id": str})
+first_day, last_day = service_calendar.window
+
+col1, col2 = st.columns([1, 3])
+with col1:
+    service_date = st.date_input("Service date", value=first_day, min_value=first_day, max_value=last_day)
+    use_range = st.checkbox("Through a later date")
+    through_date = None
+    if use_range:
+        through_date = st.date_input("Through", value=last_day, min_value=service_date, max_value=last_day)
+
+active_services = service_calendar.active_services(service_date, through_date)
+active_routes = service_calendar.active_routes(service_date, through_date).merge(gtfs_routes, on="route_id")
+with col1:
+    st.metric("Active Services", int(active_services.sum()))
+    st.metric("Scheduled Trips", f"{int(active_routes['trips'].sum()):,}")
+    st.metric("Routes Running", len(active_routes))
+
+with col2:
+    trips_per_day = service_calendar.trips_per_day()
+    fig_service_days = px.bar(
+        x=trips_per_day.index, y=trips_per_day.values,
+        title="Scheduled Trips per Day (feed validity window)",
+        labels={"x": "Date", "y": "Trips"}
+    )
+    selected_days = (trips_per_day.index.date >= service_date) & (trips_per_day.index.date <= (through_date or service_date))
+    fig_service_days.update_traces(marker_color=["#667eea" if selected else "#cbd5e1" for selected in selected_days])
+    st.plotly_chart(fig_service_days, use_container_width=True)
+
+rapid_transit = active_routes[active_routes["route_type"] <= 1].sort_values("route_sort_order")
+if len(rapid_transit):
+    fig_rapid_transit = px.bar(
+        rapid_transit, x="route_long_name", y="trips",
+        title="Rapid Transit Trips Scheduled" + (f" {service_date} to {through_date}" if through_date else f" on {service_date}"),
+        labels={"route_long_name": "Route", "trips": "Trips"}
+    )
+    fig_rapid_transit.update_traces(marker_color=["#" + color for color in rapid_transit["route_color"].astype(str)])
+    st.plotly_chart(fig_rapid_transit, use_container_width=True)
+
 # --- Geographic Analysis ---
 st.subheader("Geographic Network Analysis")
 
-# Merge location data with centrality data
-locations_analysis = locations_df.merge(centrality_df, left_on="Station Name", right_on="Station", how="left")
+# Location data merged with centrality data
+locations_analysis = bundle.table("locations")
 
 # Geographic distribution of connectivity
 fig_geo_connectivity = px.scatter(
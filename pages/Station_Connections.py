@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 
+from network.core import load_network
+
 st.set_page_config(page_title="Connections by Line", layout="wide")
 
 # Custom CSS for better styling
@@ -104,13 +106,8 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-#Load data
-connections_df = pd.read_csv("connections.csv")
-
-#Normalize/clean
-connections_df["Color"] = connections_df["Color"].str.lower().str.strip()
-if "Minutes" in connections_df.columns:
-    connections_df["Minutes"] = pd.to_numeric(connections_df["Minutes"], errors="coerce")
+#Load data (shared network; names and colors are already normalized)
+connections_df = load_network().edges
 
 #Color map
 color_map = {
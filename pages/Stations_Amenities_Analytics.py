@@ -2,15 +2,14 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-# Load data
-@st.cache_data
-def load_data():
-    stations_df = pd.read_csv("stations.csv")
-    connections_df = pd.read_csv("connections.csv")
-    amenities_df = pd.read_csv("stations_amenities.csv")
-    return stations_df, connections_df, amenities_df
+from network.analytics import inputs_version, load_bundle
 
-stations_df, connections_df, amenities_df = load_data()
+# Load data (precomputed by `python3 -m network.analytics`)
+@st.cache_resource
+def get_bundle(bundle_version):
+    return load_bundle()
+
+bundle = get_bundle(inputs_version())
 
 # Custom CSS for better styling
 st.markdown("""
@@ -112,28 +111,8 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Merge data for comprehensive analysis
-def merge_station_data():
-    # Get all unique stations and their lines
-    station_lines = pd.concat([
-        connections_df[['From', 'Color']].rename(columns={'From': 'Station'}),
-        connections_df[['To', 'Color']].rename(columns={'To': 'Station'})
-    ]).drop_duplicates()
-    
-    # Group by station to get all lines and count
-    grouped = station_lines.groupby('Station').agg({
-        'Color': lambda x: list(set(x))
-    }).reset_index()
-    grouped['Line_Count'] = grouped['Color'].apply(len)
-    grouped.columns = ['Station', 'Lines', 'Line_Count']
-    grouped['Lines_Str'] = grouped['Lines'].apply(lambda x: ', '.join([line.title() for line in x]))
-    
-    # Merge with amenities
-    merged_df = grouped.merge(amenities_df, on='Station', how='left')
-    
-    return merged_df
-
-merged_data = merge_station_data()
+# Stations with their lines and amenities (boolean / count features from the GTFS facilities)
+merged_data = bundle.table("station_amenities")
 
 # Sidebar filters
 st.sidebar.header("🔍 Filters")
@@ -148,7 +127,7 @@ selected_lines = st.sidebar.multiselect(
 )
 
 # Amenity filters
-amenity_options = ['Parking', 'Ramp', 'Lift', 'Underground']
+amenity_options = ['Parking', 'Ramp', 'Lift', 'Underground', 'Step_Free']
 selected_amenities = st.sidebar.multiselect(
     "Required Amenities",
     options=amenity_options,
@@ -175,7 +154,7 @@ if selected_lines:
 
 if selected_amenities:
     for amenity in selected_amenities:
-        filtered_data = filtered_data[filtered_data[amenity] == 'Yes']
+        filtered_data = filtered_data[filtered_data[amenity]]
 
 filtered_data = filtered_data[
     (filtered_data['Line_Count'] >= line_count_range[0]) &
@@ -190,12 +169,12 @@ with col1:
     st.metric("Multi-line Stations", len(filtered_data[filtered_data['Line_Count'] > 1]))
 
 with col2:
-    st.metric("Parking Available", len(filtered_data[filtered_data['Parking'] == 'Yes']))
-    st.metric("Ramp Access", len(filtered_data[filtered_data['Ramp'] == 'Yes']))
+    st.metric("Parking Available", int(filtered_data['Parking'].sum()))
+    st.metric("Ramp Access", int(filtered_data['Ramp'].sum()))
 
 with col3:
-    st.metric("Lift Access", len(filtered_data[filtered_data['Lift'] == 'Yes']))
-    st.metric("Underground", len(filtered_data[filtered_data['Underground'] == 'Yes']))
+    st.metric("Lift Access", int(filtered_data['Lift'].sum()))
+    st.metric("Underground", int(filtered_data['Underground'].sum()))
 
 with col4:
     st.metric("Avg Lines/Station", f"{filtered_data['Line_Count'].mean():.1f}")
@@ -227,8 +206,8 @@ with tab2:
     
     # Accessibility metrics
     accessibility_data = []
-    for amenity in ['Ramp', 'Lift']:
-        count = len(filtered_data[filtered_data[amenity] == 'Yes'])
+    for amenity in ['Ramp', 'Lift', 'Step_Free']:
+        count = int(filtered_data[amenity].sum())
         total = len(filtered_data)
         percentage = (count / total) * 100 if total > 0 else 0
         accessibility_data.append({
@@ -247,19 +226,17 @@ with tab2:
         title="Accessibility Coverage by Amenity",
         text='Count',
         color='Amenity',
-        color_discrete_map={'Ramp': '#2ecc71', 'Lift': '#3498db'}
+        color_discrete_map={'Ramp': '#2ecc71', 'Lift': '#3498db', 'Step_Free': '#9b59b6'}
     )
     fig_acc.update_traces(textposition='outside')
     st.plotly_chart(fig_acc, use_container_width=True)
     
-    # Fully accessible stations
-    full_access = filtered_data[
-        (filtered_data['Ramp'] == 'Yes') & 
-        (filtered_data['Lift'] == 'Yes')
-    ]
+    # Fully accessible stations: step-free per the feed, with a lift
+    full_access = filtered_data[filtered_data['Step_Free'] & filtered_data['Lift']]
     st.subheader("Fully Accessible Stations")
     if len(full_access) > 0:
-        st.dataframe(full_access[['Station', 'Lines_Str', 'Line_Count']], use_container_width=True)
+        st.dataframe(full_access[['Station', 'Lines_Str', 'Line_Count', 'elevator', 'escalator']],
+                     use_container_width=True)
     else:
         st.info("No stations found with full accessibility features")
 
@@ -267,16 +244,18 @@ with tab3:
     st.subheader("Parking Analysis")
     
     # Parking statistics
-    parking_stations = filtered_data[filtered_data['Parking'] == 'Yes']
+    parking_stations = filtered_data[filtered_data['Parking']]
     parking_percentage = (len(parking_stations) / len(filtered_data)) * 100 if len(filtered_data) > 0 else 0
     
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     with col1:
         st.metric("Stations with Parking", len(parking_stations))
     with col2:
         st.metric("Parking Coverage", f"{parking_percentage:.1f}%")
     with col3:
         st.metric("Avg Lines (Parking)", f"{parking_stations['Line_Count'].mean():.1f}")
+    with col4:
+        st.metric("Parking Spaces", f"{int(parking_stations['Parking_Spaces'].sum()):,}")
     
     # Parking by line analysis
     if len(parking_stations) > 0:
@@ -298,22 +277,24 @@ with tab3:
 st.header("Station Information")
 
 # Create a clean display table
-display_columns = ['Station', 'Lines_Str', 'Line_Count', 'Parking', 'Ramp', 'Lift', 'Underground']
+display_columns = ['Station', 'Lines_Str', 'Line_Count', 'Parking', 'Ramp', 'Lift', 'Underground', 'Step_Free',
+                   'elevator', 'escalator', 'Parking_Spaces']
 display_data = filtered_data[display_columns].copy()
 
 # Rename columns for better display
-display_data.columns = ['Station', 'Lines', 'Line Count', 'Parking', 'Ramp', 'Lift', 'Underground']
+display_data.columns = ['Station', 'Lines', 'Line Count', 'Parking', 'Ramp', 'Lift', 'Underground', 'Step-Free',
+                        'Elevators', 'Escalators', 'Parking Spaces']
 
 # Add amenity icons
 def add_amenity_icons(row):
     icons = []
-    if row['Parking'] == 'Yes':
+    if row['Parking']:
         icons.append("🅿️")
-    if row['Ramp'] == 'Yes':
+    if row['Ramp']:
         icons.append("♿")
-    if row['Lift'] == 'Yes':
+    if row['Lift']:
         icons.append("🛗")
-    if row['Underground'] == 'Yes':
+    if row['Underground']:
         icons.append("🚇")
     return ' '.join(icons) if icons else "—"
 
@@ -0,0 +1,8 @@
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The API modules import each other by bare name, as when run from API/
+for path in (REPO_ROOT, os.path.join(REPO_ROOT, "API")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,18 @@
+import os
+
+from network.analytics import build_bundle
+
+
+def test_rebuild_keeps_current_bundle_and_prunes_old(tmp_path):
+    old = tmp_path / "analytics-0000000000000000"
+    old.mkdir()
+    (old / "manifest.json").write_text("{}")
+
+    path = build_bundle(artifact_dir=str(tmp_path))
+    marker = os.path.join(path, "marker")
+    open(marker, "w").close()
+    assert build_bundle(artifact_dir=str(tmp_path)) == path
+
+    assert os.path.exists(marker)
+    assert not old.exists()
+    assert [name for name in os.listdir(tmp_path) if name.startswith("analytics-")] == [os.path.basename(path)]
@@ -0,0 +1,15 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from network.betweenness import network_betweenness
+from network.core import load_network
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+@pytest.mark.parametrize("weighted", [True, False])
+def test_matches_networkx(processes, weighted):
+    network = load_network()
+    expected = nx.betweenness_centrality(network.graph, weight="weight" if weighted else None)
+    actual = network_betweenness(network, weighted=weighted, processes=processes)
+    np.testing.assert_allclose(actual, [expected[name] for name in network.stations], atol=1e-12)
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from gtfs.calendar import WEEKDAYS, load_calendar
+from gtfs.feed import load_feed
+
+
+def reference_trips(feed, day):
+    """Bool per trips.txt row by filtering calendar / calendar_dates rows for one date"""
+    day = pd.Timestamp(day)
+    number = int(day.strftime("%Y%m%d"))
+    calendar, dates = feed.calendar, feed.calendar_dates
+    running = calendar[(calendar["start_date"] <= number) & (calendar["end_date"] >= number)
+                       & (calendar[WEEKDAYS[day.weekday()]] == 1)]
+    services = set(running["service_id"].astype(str))
+    today = dates[dates["date"] == number]
+    services |= set(today.loc[today["exception_type"] == 1, "service_id"].astype(str))
+    services -= set(today.loc[today["exception_type"] == 2, "service_id"].astype(str))
+    return feed.trips["service_id"].astype(str).isin(services).to_numpy()
+
+
+def exception_day(feed, exception_type):
+    dates = feed.calendar_dates
+    return str(dates.loc[dates["exception_type"] == exception_type, "date"].iloc[0])
+
+
+@pytest.mark.parametrize("day", ["first", "added", "removed", "last", "outside"])
+def test_active_trips_match_row_filter(day):
+    feed = load_feed()
+    calendar = load_calendar(feed)
+    first_day, last_day = calendar.window
+    day = {"first": first_day, "last": last_day, "outside": last_day + pd.Timedelta(days=1),
+           "added": exception_day(feed, 1), "removed": exception_day(feed, 2)}[day]
+    assert (calendar.active_trips(day) == reference_trips(feed, day)).all()
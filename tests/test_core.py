@@ -0,0 +1,24 @@
+import hashlib
+import os
+
+from network.core import file_sha1, load_network
+
+
+def test_file_sha1_follows_edits(tmp_path):
+    path = tmp_path / "connections.csv"
+    path.write_text("From,To,Color,Minutes\n")
+    assert file_sha1(path) == hashlib.sha1(path.read_bytes()).hexdigest()
+
+    path.write_text("From,To,Color,Minutes\nAlewife,Davis,red,2\n")
+    os.utime(path, ns=(0, 0))
+    assert file_sha1(path) == hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def test_without_drops_closures():
+    network = load_network()
+    closed = network.without(stations=["Park Street"], segments=[("Davis", "Porter Square")])
+    assert "Park Street" not in closed.stations
+    links = set(closed.links[["From", "To"]].itertuples(index=False, name=None))
+    assert ("Davis", "Porter Square") not in links and ("Porter Square", "Davis") not in links
+    assert closed.version != network.version
+    assert network.without().n_stations == network.n_stations
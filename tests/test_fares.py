@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from gtfs.fares import load_fare_engine
+from main import FareLeg
+
+COLUMNS = ["journey", "route_id", "from_stop", "to_stop", "start_time"]
+
+
+def price(rows, fare_media="charlieticket"):
+    return load_fare_engine().price_journeys(pd.DataFrame(rows, columns=COLUMNS), fare_media)
+
+
+def test_leg_groups_have_no_blank():
+    assert "" not in set(load_fare_engine().leg_groups)
+
+
+def test_subway_transfer_is_free():
+    fares = price([(1, "Red", "Park Street", "Downtown Crossing", "08:00"),
+                   (1, "Orange", "Downtown Crossing", "Back Bay", "08:10")])
+    assert fares.loc[0, "fare"] == 2.4
+    assert fares.loc[0, "transfers"] == 1
+
+
+def test_api_requires_a_start_time():
+    # Subway leg rules all name a timeframe, so an untimed leg would silently price as null
+    with pytest.raises(ValidationError):
+        FareLeg(from_stop="Park Street", to_stop="Harvard", route_id="Red")
+    assert FareLeg(from_stop="Park Street", to_stop="Harvard", route_id="Red", start_time="08:00")
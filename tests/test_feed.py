@@ -0,0 +1,20 @@
+from gtfs.feed import GTFSFeed
+
+
+def write_stops(path, names):
+    rows = "".join(f"s{i},{name},0\n" for i, name in enumerate(names))
+    (path / "stops.txt").write_text("stop_id,stop_name,location_type\n" + rows)
+
+
+def test_table_follows_source_changes(tmp_path):
+    source = tmp_path / "feed"
+    source.mkdir()
+    write_stops(source, ["Alewife"])
+    feed = GTFSFeed(str(source), str(tmp_path / "cache"))
+    assert list(feed.stops["stop_name"]) == ["Alewife"]
+    old_version = feed.version("stops")
+
+    write_stops(source, ["Alewife", "Davis"])
+    assert list(feed.stops["stop_name"]) == ["Alewife", "Davis"]
+    assert feed.version("stops") != old_version
+    assert list(GTFSFeed(str(source), str(tmp_path / "cache")).stops["stop_name"]) == ["Alewife", "Davis"]
@@ -0,0 +1,28 @@
+from starlette.requests import Request
+
+from http_cache import CachedResponse, accepts_gzip, make_etag
+
+
+def request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_accepts_gzip_reads_q_values():
+    assert accepts_gzip("gzip, deflate")
+    assert accepts_gzip("br;q=1.0, gzip;q=0.5")
+    assert accepts_gzip("*")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("*;q=0.5, gzip;q=0")
+    assert not accepts_gzip(None)
+
+
+def test_each_encoding_has_its_own_etag():
+    cached = CachedResponse({"stations": []}, make_etag("stations", 1), 60)
+    plain = cached.respond(request())
+    gzipped = cached.respond(request(accept_encoding="gzip"))
+    assert plain.headers["etag"] != gzipped.headers["etag"]
+    assert gzipped.headers["vary"] == "Accept-Encoding"
+    # A validator for one encoding does not revalidate the other
+    assert cached.respond(request(accept_encoding="gzip", if_none_match=plain.headers["etag"])).status_code == 200
+    assert cached.respond(request(accept_encoding="gzip", if_none_match=gzipped.headers["etag"])).status_code == 304
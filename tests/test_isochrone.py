@@ -0,0 +1,26 @@
+import pandas as pd
+
+from network.core import Network, load_network
+from network.isochrone import IsochroneIndex
+
+
+def line_network():
+    # One-way rows, as connections.csv lists them: A -> B -> C
+    rows = pd.DataFrame({"From": ["A", "B"], "To": ["B", "C"], "Color": ["red", "red"], "Minutes": [2.0, 3.0]})
+    return Network(rows, "test")
+
+
+def test_terminal_reaches_its_neighbours():
+    reachable = IsochroneIndex(line_network()).reachable("C", 10)
+    assert reachable.set_index("Station")["Minutes"].to_dict() == {"C": 0.0, "B": 3.0, "A": 5.0}
+    assert reachable.set_index("Station").loc["A", "Via"] == "B"
+
+
+def test_budget_limits_reverse_search():
+    assert list(IsochroneIndex(line_network()).reachable("C", 4)["Station"]) == ["C", "B"]
+
+
+def test_braintree_reaches_quincy_adams():
+    reachable = IsochroneIndex(load_network()).reachable("Braintree", 60)
+    assert "Quincy Adams" in set(reachable["Station"])
+    assert len(reachable) > 1
@@ -0,0 +1,12 @@
+from network.names import normalize_station_name
+
+
+def test_spellings_share_a_key():
+    assert normalize_station_name("Porter Square") == normalize_station_name("Porter")
+    assert normalize_station_name("St. Paul Street (1)") == normalize_station_name("Saint Paul Street")
+    assert normalize_station_name("St. Mary's Street") == normalize_station_name("Saint Marys Street")
+    assert normalize_station_name("Science Park") == normalize_station_name("Science Park/West End")
+
+
+def test_longwood_stations_stay_apart():
+    assert normalize_station_name("Longwood") != normalize_station_name("Longwood Medical Area")
@@ -0,0 +1,63 @@
+"""EXPLAIN check for the API's hot queries.
+
+Runs EXPLAIN on each query below against the configured database and fails
+if any of the listed tables is read with a full scan (type=ALL) or needs a
+filesort. Skipped when no database is reachable; run it after applying
+DB/AddIndexesSEQ3.sql.
+"""
+import pytest
+
+import queries
+from db_pool import create_db_connection
+
+# (name, sql, params, tables that must be index lookups, filesort allowed)
+HOT_QUERIES = [
+    ("line by code", queries.LINE_BY_CODE_SQL, ("RL",), ("mbta_lines",), False),
+    # IN over two names is two index ranges, so ORDER BY id sorts the (at most two) matches
+    ("line by name", queries.LINE_BY_NAME_SQL, queries.line_name_candidates("Red"), ("mbta_lines",), True),
+    ("line stations", queries.LINE_STATIONS_SQL, (1,), ("ls", "s"), False),
+    # Every active line is returned, so only the join side must use an index
+    ("lines with counts", queries.LINES_SQL, None, ("ls",), True),
+]
+
+
+def explain(connection, sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN " + sql, params)
+        return cursor.fetchall()
+
+
+def check_plan(plan, indexed_tables, allow_filesort):
+    """Problems found in one EXPLAIN result (empty if the plan is fine)"""
+    problems = []
+    for row in plan:
+        table = row.get('table')
+        extra = row.get('Extra') or ""
+        if table in indexed_tables and row.get('type') == 'ALL':
+            problems.append(f"full scan of {table}")
+        if not allow_filesort and "Using filesort" in extra:
+            problems.append(f"filesort on {table}")
+    return problems
+
+
+@pytest.fixture(scope="module")
+def connection():
+    try:
+        connection = create_db_connection()
+    except Exception as e:
+        pytest.skip(f"no database: {e}")
+    yield connection
+    connection.close()
+
+
+@pytest.mark.parametrize("name, sql, params, indexed_tables, allow_filesort", HOT_QUERIES,
+                         ids=[query[0] for query in HOT_QUERIES])
+def test_hot_query_uses_indexes(connection, name, sql, params, indexed_tables, allow_filesort):
+    plan = explain(connection, sql, params)
+    assert check_plan(plan, indexed_tables, allow_filesort) == [], plan
+
+
+def test_check_plan_flags_scans_and_filesorts():
+    plan = [{'table': 'mbta_lines', 'type': 'ALL', 'Extra': 'Using where; Using filesort'}]
+    assert check_plan(plan, ("mbta_lines",), False) == ["full scan of mbta_lines", "filesort on mbta_lines"]
+    assert check_plan(plan, (), True) == []
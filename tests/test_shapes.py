@@ -0,0 +1,46 @@
+import numpy as np
+
+from gtfs.feed import GTFSFeed
+from gtfs.shapes import route_shape_coordinates, stop_points
+
+
+def write_feed(path):
+    path.mkdir()
+    (path / "stops.txt").write_text(
+        "stop_id,stop_name,stop_lat,stop_lon,location_type,parent_station\n"
+        "place-davis,Davis,42.39,-71.12,1,\n"
+        "70063,Davis - Inbound,42.39,-71.12,0,place-davis\n"
+        "2615,Elm St opp Grove St,42.40,-71.11,0,\n")
+    (path / "routes.txt").write_text(
+        "route_id,route_short_name,route_long_name,route_color\n"
+        "Red,,Red Line,DA291C\n"
+        "87,87,,\n")
+    (path / "trips.txt").write_text(
+        "route_id,service_id,trip_id,shape_id\n"
+        "Red,wk,t1,r1\n"
+        "Red,wk,t2,r1\n"
+        "Red,wk,t3,r2\n"
+        "87,wk,t4,b1\n")
+    (path / "shapes.txt").write_text(
+        "shape_id,shape_pt_lat,shape_pt_lon,shape_pt_sequence\n"
+        "r1,42.0,-71.1,2\n"
+        "r1,42.1,-71.0,1\n"
+        "r2,42.2,-71.2,1\n"
+        "b1,42.3,-71.3,1\n")
+
+
+def test_stations_and_loose_stops_only(tmp_path):
+    write_feed(tmp_path / "feed")
+    feed = GTFSFeed(str(tmp_path / "feed"), str(tmp_path / "cache"))
+    assert list(stop_points(feed.stops)["stop_name"]) == ["Davis", "Elm St opp Grove St"]
+
+
+def test_shapes_stack_per_route(tmp_path):
+    write_feed(tmp_path / "feed")
+    feed = GTFSFeed(str(tmp_path / "feed"), str(tmp_path / "cache"))
+    coordinates = route_shape_coordinates(feed.routes, feed.trips, feed.shapes)
+
+    label, color, x, y = coordinates["Red"]
+    assert (label, color) == ("Red Line", "#DA291C")
+    np.testing.assert_allclose(x, [-71.0, -71.1, np.nan, -71.2])
+    assert coordinates["87"][:2] == ("87", "#95a5a6")
@@ -0,0 +1,10 @@
+from gtfs.feed import load_feed
+from gtfs.transfers import load_transfer_table
+from network.core import load_network
+
+
+def test_walking_minutes_match_project_station_names():
+    feed = load_feed()
+    minutes = load_transfer_table(feed).transfer_minutes_by_station(feed.stops, load_network().stations)
+    for station in ("Porter Square", "Harvard Square", "New England Medical Center"):
+        assert minutes[station] > 0
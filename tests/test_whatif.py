@@ -0,0 +1,25 @@
+from network.analytics import AnalyticsBundle, build_bundle
+from network.core import load_network
+from network.whatif import WhatIfEngine
+
+
+def test_closing_a_segment_cuts_both_directions():
+    result = WhatIfEngine(load_network()).apply(closed_segments=[("Davis", "Porter Square")])
+    pairs = set(result.disconnected_pairs()[["From", "To"]].itertuples(index=False, name=None))
+    assert ("Alewife", "Harvard Square") in pairs
+    assert {(to, start) for start, to in pairs} == pairs
+
+
+def test_unchanged_network_reports_zero_delta():
+    summary = WhatIfEngine(load_network()).apply().summary()
+    assert summary["pairs_changed"] == 0
+    assert str(summary["mean_delta_minutes"]) == "0.0"
+
+
+def test_bundle_base_matches_computed_base(tmp_path):
+    network = load_network()
+    bundle = AnalyticsBundle(build_bundle(artifact_dir=str(tmp_path)))
+    from_bundle = WhatIfEngine(network, bundle.two_way_travel_times).apply(closed_stations=["Park Street"])
+    computed = WhatIfEngine(network).apply(closed_stations=["Park Street"])
+    assert from_bundle.summary() == computed.summary()
+    assert computed.summary()["pairs_changed"] == 0